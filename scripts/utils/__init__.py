@@ -1,6 +1,7 @@
 from .logging_config import setup_logger
 from .vault_helpers import (
     append_json_log,
+    extend_json_log,
     get_vault_path,
     is_dry_run,
     read_frontmatter,
@@ -14,6 +15,7 @@ __all__ = [
     "write_action_file",
     "sanitize_filename",
     "append_json_log",
+    "extend_json_log",
     "read_frontmatter",
     "is_dry_run",
 ]
@@ -581,7 +581,7 @@ def rollover_activity_log(vault_path: Path) -> None:
 
         if archive_file.exists():
             try:
-                existing = json.loads(archive_file.read_text(encoding="utf-8"))
+                existing = json.loads(archive_file.read_bytes())
                 archive_data = existing + archive_data
             except (json.JSONDecodeError, OSError):
                 pass
@@ -589,7 +589,7 @@ def rollover_activity_log(vault_path: Path) -> None:
         tmp_fd, tmp_path = tempfile.mkstemp(dir=log_dir, suffix=".tmp")
         try:
             with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
-                json.dump(archive_data, f, indent=2, ensure_ascii=False)
+                f.write(json.dumps(archive_data, indent=2, ensure_ascii=False))
             Path(tmp_path).replace(archive_file)
         except Exception:
             try:
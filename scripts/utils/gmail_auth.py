@@ -1,14 +1,15 @@
 """Gmail OAuth 2.0 authentication helper for AI Employee."""
 
+from __future__ import annotations
+
 import json
 import logging
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from google.auth.exceptions import RefreshError
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import Resource, build
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import Resource
 
 SCOPES = [
     "https://www.googleapis.com/auth/gmail.readonly",
@@ -58,6 +59,14 @@ def get_gmail_service(
       FileNotFoundError: if credentials_path doesn't exist
       AuthenticationError: if OAuth flow fails (custom exception)
     """
+    # Imported here so DRY_RUN runs and tests never load the Google client
+    # libraries (tens of ms of import time).
+    from google.auth.exceptions import RefreshError
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
+
     credentials_path = Path(credentials_path)
     token_path = Path(token_path)
     effective_scopes = scopes or SCOPES
@@ -2,7 +2,6 @@
 
 import json
 import os
-import re
 import tempfile
 import unicodedata
 from datetime import datetime, timezone
@@ -10,6 +9,14 @@ from pathlib import Path
 
 import yaml
 
+# Prefer libyaml's C parser; fall back to the pure-Python one if PyYAML
+# was built without it. Writing stays on the pure-Python SafeDumper: the C
+# emitter escapes emoji ("\U0001F525") even with allow_unicode.
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Single-pass filename cleanup: spaces -> underscores, illegal chars dropped.
+_FILENAME_TRANS = str.maketrans({" ": "_", **dict.fromkeys('/\\:*?"<>|')})
+
 
 def get_vault_path() -> Path:
     """Return vault path from VAULT_PATH env var. Validate it exists."""
@@ -34,11 +41,8 @@ def sanitize_filename(raw: str, max_length: int = 200) -> str:
     normalized = unicodedata.normalize("NFKD", raw)
     ascii_str = normalized.encode("ascii", "ignore").decode("ascii")
 
-    # Replace spaces with underscores
-    result = ascii_str.replace(" ", "_")
-
-    # Remove illegal filename characters
-    result = re.sub(r'[/\\:*?"<>|]', "", result)
+    # Replace spaces with underscores and remove illegal characters
+    result = ascii_str.translate(_FILENAME_TRANS)
 
     # Truncate
     return result[:max_length]
@@ -77,7 +81,9 @@ def write_action_file(
             counter += 1
 
     # Build content
-    fm_str = yaml.dump(frontmatter, default_flow_style=False, allow_unicode=True)
+    fm_str = yaml.dump(
+        frontmatter, Dumper=yaml.SafeDumper, default_flow_style=False, allow_unicode=True
+    )
     content = f"---\n{fm_str}---\n\n{body}"
 
     # Atomic write: temp file in same dir → rename
@@ -104,6 +110,16 @@ def append_json_log(log_dir: Path, entry: dict) -> None:
     Create file with empty array if not exists.
     Read → append → write atomically.
     """
+    extend_json_log(log_dir, [entry])
+
+
+def extend_json_log(log_dir: Path, entries: list[dict]) -> None:
+    """
+    Append several JSON log entries to /Logs/YYYY-MM-DD.json in one write.
+
+    Same format as append_json_log, but the file is read and rewritten
+    once for the whole batch instead of once per entry.
+    """
     log_dir.mkdir(parents=True, exist_ok=True)
     today = datetime.now(tz=timezone.utc).strftime("%Y-%m-%d")
     log_file = log_dir / f"{today}.json"
@@ -111,20 +127,19 @@ def append_json_log(log_dir: Path, entry: dict) -> None:
     # Read existing data
     if log_file.exists():
         try:
-            with log_file.open("r", encoding="utf-8") as f:
-                data: list = json.load(f)
+            data: list = json.loads(log_file.read_bytes())
         except (json.JSONDecodeError, OSError):
             data = []
     else:
         data = []
 
-    data.append(entry)
+    data.extend(entries)
 
     # Atomic write
     tmp_fd, tmp_path = tempfile.mkstemp(dir=log_dir, suffix=".tmp")
     try:
         with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write(json.dumps(data, indent=2, ensure_ascii=False))
         Path(tmp_path).replace(log_file)
     except Exception:
         try:
@@ -140,22 +155,25 @@ def read_frontmatter(file_path: Path) -> dict:
 
     Return the parsed dict. Return empty dict if no frontmatter.
     """
+    # Read only up to the closing --- so a long body is never loaded
     try:
-        text = file_path.read_text(encoding="utf-8")
+        with file_path.open(encoding="utf-8") as f:
+            first = f.readline()
+            if not first.startswith("---"):
+                return {}
+            lines = [first[3:]]
+            for line in f:
+                if line.startswith("---"):
+                    break
+                lines.append(line)
+            else:
+                return {}
     except OSError:
         return {}
 
-    if not text.startswith("---"):
-        return {}
-
-    # Find closing ---
-    end = text.find("\n---", 3)
-    if end == -1:
-        return {}
-
-    fm_block = text[3:end].strip()
+    fm_block = "".join(lines).strip()
     try:
-        result = yaml.safe_load(fm_block)
+        result = yaml.load(fm_block, Loader=_YamlLoader)
         return result if isinstance(result, dict) else {}
     except yaml.YAMLError:
         return {}
@@ -4,11 +4,12 @@ import json
 import logging
 import time
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
 from datetime import datetime, timezone
 from pathlib import Path
 
 from scripts.utils.logging_config import setup_logger
-from scripts.utils.vault_helpers import append_json_log, is_dry_run
+from scripts.utils.vault_helpers import extend_json_log, is_dry_run
 
 # Maximum number of processed IDs to retain in the state file.
 _STATE_MAX_IDS = 10_000
@@ -75,7 +76,9 @@ class BaseWatcher(ABC):
             self.vault_path / ".state" / f"{watcher_name}_processed.json"
         )
         self._state_file.parent.mkdir(parents=True, exist_ok=True)
-        self._processed_ids: list[str] = []
+        # Insertion-ordered dict used as an ordered set: O(1) membership for
+        # dedup, oldest-first order for FIFO trimming.
+        self._processed_ids: dict[str, None] = {}
         self._load_state()
 
     # ------------------------------------------------------------------
@@ -83,11 +86,12 @@ class BaseWatcher(ABC):
     # ------------------------------------------------------------------
 
     @abstractmethod
-    def check_for_updates(self) -> list[dict]:
+    def check_for_updates(self) -> Iterable[dict]:
         """
         Poll the external source for new items.
 
-        Returns a list of dicts, each with at minimum:
+        run_once iterates the result exactly once, so a list or a generator
+        both work. Each item is a dict with at minimum:
           - "id": str  (unique identifier for dedup)
           - "type": str  (email, whatsapp, file_drop, etc.)
           - "source": str  (sender, contact, filename)
@@ -119,14 +123,18 @@ class BaseWatcher(ABC):
 
     def mark_processed(self, item_id: str) -> None:
         """Add item_id to the processed set and persist to the state file."""
-        if item_id not in self._processed_ids:
-            self._processed_ids.append(item_id)
+        self._remember_processed(item_id)
+        self._save_state()
+
+    def _remember_processed(self, item_id: str) -> None:
+        """Add item_id to the in-memory processed set without persisting."""
+        # Re-assigning an existing key keeps its original position.
+        self._processed_ids[item_id] = None
         # Cap at _STATE_MAX_IDS — drop oldest entries (FIFO)
         if len(self._processed_ids) > _STATE_MAX_IDS:
-            self._processed_ids = self._processed_ids[
-                len(self._processed_ids) - _STATE_TRIM_TO :
-            ]
-        self._save_state()
+            self._processed_ids = dict.fromkeys(
+                list(self._processed_ids)[-_STATE_TRIM_TO:]
+            )
 
     # ------------------------------------------------------------------
     # Main loop
@@ -176,37 +184,47 @@ class BaseWatcher(ABC):
 
         Returns list of created file paths.
         Useful for testing without entering the infinite loop.
+        Processed IDs and audit log entries are each persisted in one
+        write at the end of the cycle.
         """
         prefix = "[DRY RUN] " if self.is_dry_run else ""
         items = self.check_for_updates()
         created: list[Path] = []
+        log_entries: list[dict] = []
 
-        for item in items:
-            item_id: str = item["id"]
-            if not self.should_process(item_id):
-                self.logger.debug(
-                    "%s%s: skipping already-processed item %s",
-                    prefix,
-                    self.watcher_name,
-                    item_id,
-                )
-                continue
+        try:
+            for item in items:
+                item_id: str = item["id"]
+                if not self.should_process(item_id):
+                    self.logger.debug(
+                        "%s%s: skipping already-processed item %s",
+                        prefix,
+                        self.watcher_name,
+                        item_id,
+                    )
+                    continue
 
-            try:
-                output_path = self.create_action_file(item)
-            except (OSError, PermissionError) as exc:
-                self.logger.error(
-                    "%s%s: failed to create action file for item %s: %s",
-                    prefix,
-                    self.watcher_name,
-                    item_id,
-                    exc,
-                )
-                continue
-
-            self.mark_processed(item_id)
-            self._log_action(item, output_path)
-            created.append(output_path)
+                try:
+                    output_path = self.create_action_file(item)
+                except (OSError, PermissionError) as exc:
+                    self.logger.error(
+                        "%s%s: failed to create action file for item %s: %s",
+                        prefix,
+                        self.watcher_name,
+                        item_id,
+                        exc,
+                    )
+                    continue
+
+                self._remember_processed(item_id)
+                log_entries.append(self._build_log_entry(item, output_path))
+                created.append(output_path)
+        finally:
+            # Flush even if a later item raised, so files already created
+            # are neither re-processed next cycle nor missing from the log.
+            if created:
+                self._save_state()
+            self._write_log_entries(log_entries)
 
         return created
 
@@ -214,15 +232,15 @@ class BaseWatcher(ABC):
     # Audit logging
     # ------------------------------------------------------------------
 
-    def _log_action(self, item: dict, output_path: Path) -> None:
-        """Append a structured log entry to /Logs/YYYY-MM-DD.json."""
+    def _build_log_entry(self, item: dict, output_path: Path) -> dict:
+        """Build the structured audit log entry for one created action file."""
         prefix = "[DRY RUN] " if self.is_dry_run else ""
         try:
             relative_output = output_path.relative_to(self.vault_path)
         except ValueError:
             relative_output = output_path
 
-        entry: dict = {
+        return {
             "timestamp": datetime.now(tz=timezone.utc).isoformat(),
             "action_type": "watcher_detect",
             "actor": self.watcher_name,
@@ -236,8 +254,13 @@ class BaseWatcher(ABC):
             "error": None,
         }
 
+    def _write_log_entries(self, entries: list[dict]) -> None:
+        """Append entries to /Logs/YYYY-MM-DD.json in a single write."""
+        if not entries:
+            return
+        prefix = "[DRY RUN] " if self.is_dry_run else ""
         try:
-            append_json_log(self.logs_path, entry)
+            extend_json_log(self.logs_path, entries)
         except OSError as exc:
             self.logger.error(
                 "%s%s: failed to write audit log: %s",
@@ -264,24 +287,23 @@ class BaseWatcher(ABC):
     def _load_state(self) -> None:
         """Load processed IDs from the state file on disk."""
         if not self._state_file.exists():
-            self._processed_ids = []
+            self._processed_ids = {}
             return
         try:
-            with self._state_file.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            self._processed_ids = list(data.get("processed_ids", []))
+            data = json.loads(self._state_file.read_bytes())
+            self._processed_ids = dict.fromkeys(data.get("processed_ids", []))
         except (json.JSONDecodeError, OSError) as exc:
             self.logger.warning(
                 "%s: state file corrupted, resetting: %s", self.watcher_name, exc
             )
-            self._processed_ids = []
+            self._processed_ids = {}
 
     def _save_state(self) -> None:
         """Persist processed IDs to the state file atomically."""
         import tempfile
 
         data = {
-            "processed_ids": self._processed_ids,
+            "processed_ids": list(self._processed_ids),
             "last_updated": datetime.now(tz=timezone.utc).isoformat(),
         }
         state_dir = self._state_file.parent
@@ -292,7 +314,8 @@ class BaseWatcher(ABC):
         tmp_fd, tmp_path = tempfile.mkstemp(dir=state_dir, suffix=".tmp")
         try:
             with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+                # Machine-only file: compact, one line however many IDs it holds
+                f.write(json.dumps(data, separators=(",", ":")))
             Path(tmp_path).replace(self._state_file)
         except OSError as exc:
             self.logger.error(
@@ -8,11 +8,14 @@ _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 if str(_PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(_PROJECT_ROOT))
 
-import base64  # noqa: E402
+import binascii  # noqa: E402
+import functools  # noqa: E402
 import os  # noqa: E402
 import re  # noqa: E402
+from collections.abc import Iterator  # noqa: E402
 from datetime import datetime, timezone  # noqa: E402
 from email.utils import parseaddr, parsedate_to_datetime  # noqa: E402
+from typing import TYPE_CHECKING  # noqa: E402
 
 from googleapiclient.errors import HttpError  # noqa: E402
 
@@ -20,8 +23,100 @@ from scripts.utils.gmail_auth import get_gmail_service  # noqa: E402
 from scripts.utils.vault_helpers import sanitize_filename, write_action_file  # noqa: E402
 from scripts.watchers.base_watcher import BaseWatcher  # noqa: E402
 
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+
 _BODY_MAX_LENGTH = 2000
+# Base64 chars that always cover _BODY_MAX_LENGTH decoded characters:
+# worst case 4 UTF-8 bytes per char, 4 base64 chars per 3 bytes.
+_BODY_MAX_B64 = -(-_BODY_MAX_LENGTH * 4 // 3) * 4
 _MAX_MESSAGES_PER_CYCLE = 50
+# Gmail accepts up to 100 calls per batch but advises <= 50 to avoid rate limits.
+_BATCH_SIZE = 50
+
+# Any of these labels (without IMPORTANT) marks a message low priority
+_LOW_PRIORITY_LABELS: frozenset[str] = frozenset(
+    {"CATEGORY_PROMOTIONS", "CATEGORY_SOCIAL", "SPAM"}
+)
+
+# HTML stripping patterns, compiled once at import
+_SCRIPT_STYLE_RE = re.compile(
+    r"<(script|style)[^>]*>.*?</(script|style)>", re.DOTALL | re.IGNORECASE
+)
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Gmail bodies are URL-safe base64; map to the standard alphabet for binascii
+_B64_TRANS = bytes.maketrans(b"-_", b"+/")
+
+# Sample emails returned by check_for_updates in DRY_RUN mode
+_DRY_RUN_SAMPLES: tuple[dict, ...] = (
+    {
+        "id": "dry_run_001",
+        "thread_id": "dry_thread_001",
+        "type": "email",
+        "source": "Client A <client@example.com>",
+        "sender_email": "client@example.com",
+        "sender_name": "Client A",
+        "to": "employee@company.com",
+        "subject": "URGENT: Overdue Invoice #2024-001",
+        "received": "2026-02-26T09:00:00+00:00",
+        "content": (
+            "Hello,\n\nThis is an urgent reminder that invoice #2024-001 "
+            "for $5,000 is now 30 days overdue. Please process this "
+            "immediately or we will have to escalate.\n\nBest regards,\nClient A"
+        ),
+        "snippet": "URGENT: Invoice #2024-001 is 30 days overdue...",
+        "labels": ["IMPORTANT", "INBOX"],
+        "has_attachments": False,
+        "attachment_names": [],
+        "priority": "critical",
+        "requires_approval": False,
+    },
+    {
+        "id": "dry_run_002",
+        "thread_id": "dry_thread_002",
+        "type": "email",
+        "source": "Jane Smith <jane.smith@example.com>",
+        "sender_email": "jane.smith@example.com",
+        "sender_name": "Jane Smith",
+        "to": "employee@company.com",
+        "subject": "Q1 Strategy Meeting — Can you attend Thursday?",
+        "received": "2026-02-26T10:00:00+00:00",
+        "content": (
+            "Hi,\n\nI'd like to schedule a Q1 strategy meeting for Thursday "
+            "at 2pm. Please let me know if you're available and I'll send a "
+            "calendar invite.\n\nBest,\nJane"
+        ),
+        "snippet": "Q1 strategy meeting Thursday 2pm...",
+        "labels": ["IMPORTANT", "INBOX"],
+        "has_attachments": False,
+        "attachment_names": [],
+        "priority": "high",
+        "requires_approval": False,
+    },
+    {
+        "id": "dry_run_003",
+        "thread_id": "dry_thread_003",
+        "type": "email",
+        "source": "Newsletter <newsletter@deals.example.com>",
+        "sender_email": "newsletter@deals.example.com",
+        "sender_name": "Newsletter",
+        "to": "employee@company.com",
+        "subject": "50% off all products this weekend only!",
+        "received": "2026-02-26T08:00:00+00:00",
+        "content": (
+            "Don't miss out! This weekend only, get 50% off all products. "
+            "Use code WEEKEND50 at checkout. Shop now at example.com/deals"
+        ),
+        "snippet": "50% off all products this weekend only!",
+        "labels": ["CATEGORY_PROMOTIONS", "INBOX"],
+        "has_attachments": False,
+        "attachment_names": [],
+        "priority": "low",
+        "requires_approval": False,
+    },
+)
 
 
 class GmailWatcher(BaseWatcher):
@@ -57,12 +152,18 @@ class GmailWatcher(BaseWatcher):
         self._priority_keywords: list[str] = [
             k.strip().lower() for k in keywords_env.split(",") if k.strip()
         ]
+        # One alternation scan per subject; plain substring match, like `in`
+        self._priority_re: re.Pattern[str] | None = (
+            re.compile("|".join(map(re.escape, self._priority_keywords)))
+            if self._priority_keywords
+            else None
+        )
 
         if self.is_dry_run:
             self._service = None
             self.logger.info("[DRY RUN] Skipping Gmail authentication")
         else:
-            self._service = get_gmail_service(
+            self._service = _shared_gmail_service(
                 self._credentials_path, self._token_path
             )
 
@@ -78,49 +179,18 @@ class GmailWatcher(BaseWatcher):
         results: list[dict] = []
 
         try:
-            response = (
-                self._service.users()
-                .messages()
-                .list(userId="me", q=self.query_filter, maxResults=20)
-                .execute()
-            )
-
-            messages: list[dict] = list(response.get("messages", []))
-            next_page_token: str | None = response.get("nextPageToken")
-
-            # Paginate up to _MAX_MESSAGES_PER_CYCLE total
-            while next_page_token and len(messages) < _MAX_MESSAGES_PER_CYCLE:
-                remaining = _MAX_MESSAGES_PER_CYCLE - len(messages)
-                page_response = (
-                    self._service.users()
-                    .messages()
-                    .list(
-                        userId="me",
-                        q=self.query_filter,
-                        maxResults=min(20, remaining),
-                        pageToken=next_page_token,
-                    )
-                    .execute()
-                )
-                messages.extend(page_response.get("messages", []))
-                next_page_token = page_response.get("nextPageToken")
-
-            messages = messages[:_MAX_MESSAGES_PER_CYCLE]
-
-            for msg_stub in messages:
-                msg_id: str = msg_stub["id"]
+            # dict.fromkeys: dedupe while keeping order (batch request IDs must be unique)
+            pending_ids: list[str] = []
+            for msg_id in dict.fromkeys(
+                self._iter_message_ids(_MAX_MESSAGES_PER_CYCLE)
+            ):
                 if not self.should_process(msg_id):
                     self.logger.debug("Skipping already-processed message %s", msg_id)
                     continue
+                pending_ids.append(msg_id)
 
-                raw_msg = (
-                    self._service.users()
-                    .messages()
-                    .get(userId="me", id=msg_id, format="full")
-                    .execute()
-                )
-                parsed = self._parse_message(raw_msg)
-                results.append(parsed)
+            for raw_msg in self._fetch_messages(pending_ids):
+                results.append(self._parse_message(raw_msg))
 
         except HttpError as exc:
             status = exc.resp.status if hasattr(exc, "resp") else 0
@@ -130,8 +200,10 @@ class GmailWatcher(BaseWatcher):
                 )
             elif status == 401:
                 self.logger.error("Gmail auth expired (401). Attempting re-auth.")
+                # The cached client holds the expired credentials; rebuild it.
+                _shared_gmail_service.cache_clear()
                 try:
-                    self._service = get_gmail_service(
+                    self._service = _shared_gmail_service(
                         self._credentials_path, self._token_path
                     )
                 except Exception as reauth_exc:
@@ -195,18 +267,84 @@ class GmailWatcher(BaseWatcher):
     # Private helpers
     # ------------------------------------------------------------------
 
+    def _iter_message_ids(self, cap: int) -> Iterator[str]:
+        """
+        Yield up to cap message IDs matching query_filter, page by page.
+
+        Each page asks for exactly the IDs still needed, so a full cycle
+        is usually one list call, and no page is requested once cap is met.
+        """
+        messages_api = self._service.users().messages()
+        page_token: str | None = None
+        yielded = 0
+        while True:
+            kwargs: dict = {
+                "userId": "me",
+                "q": self.query_filter,
+                "maxResults": cap - yielded,
+            }
+            if page_token:
+                kwargs["pageToken"] = page_token
+            response = messages_api.list(**kwargs).execute()
+
+            for message in response.get("messages", []):
+                yield message["id"]
+                yielded += 1
+                if yielded >= cap:
+                    return
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+
+    def _fetch_messages(self, msg_ids: list[str]) -> list[dict]:
+        """
+        Fetch full message bodies through the Gmail batch endpoint.
+
+        One HTTP round-trip per _BATCH_SIZE IDs instead of one per message.
+        Returns raw messages in msg_ids order.  A message whose individual
+        call fails is logged and skipped; it stays unprocessed and is
+        retried next cycle.
+        """
+        fetched: dict[str, dict] = {}
+
+        def _on_response(
+            request_id: str, response: dict | None, exception: HttpError | None
+        ) -> None:
+            if exception is not None:
+                self.logger.warning(
+                    "Failed to fetch message %s: %s", request_id, exception
+                )
+                return
+            fetched[request_id] = response
+
+        messages_api = self._service.users().messages()
+        for start in range(0, len(msg_ids), _BATCH_SIZE):
+            batch = self._service.new_batch_http_request(callback=_on_response)
+            for msg_id in msg_ids[start : start + _BATCH_SIZE]:
+                batch.add(
+                    messages_api.get(userId="me", id=msg_id, format="full"),
+                    request_id=msg_id,
+                )
+            batch.execute()
+
+        return [fetched[msg_id] for msg_id in msg_ids if msg_id in fetched]
+
     def _parse_message(self, raw_msg: dict) -> dict:
         """Extract structured data from a Gmail API message object."""
         payload = raw_msg.get("payload", {})
-        headers: dict[str, str] = {
-            h["name"]: h["value"] for h in payload.get("headers", [])
-        }
+        headers = _extract_headers(payload)
 
-        from_header = headers.get("From", "")
+        from_header = headers.get("from", "")
         sender_name, sender_email = parseaddr(from_header)
 
-        received = _parse_gmail_date(headers.get("Date", ""))
-        content = _extract_body(raw_msg)
+        received = _parse_gmail_date(headers.get("date", ""))
+        plain_data, html_data, attachment_names = _walk_parts(payload)
+        # Only the text/plain body can be cut before decoding; stripping
+        # tags changes html length unpredictably.
+        content = _select_body(
+            plain_data[:_BODY_MAX_B64], html_data, raw_msg.get("snippet", "")
+        )
         if len(content) > _BODY_MAX_LENGTH:
             content = content[:_BODY_MAX_LENGTH]
 
@@ -219,14 +357,14 @@ class GmailWatcher(BaseWatcher):
             "source": from_header,
             "sender_email": sender_email,
             "sender_name": sender_name,
-            "to": headers.get("To", ""),
-            "subject": headers.get("Subject", "(No Subject)"),
+            "to": headers.get("to", ""),
+            "subject": headers.get("subject", "(No Subject)"),
             "received": received,
             "content": content,
             "snippet": raw_msg.get("snippet", ""),
             "labels": labels,
-            "has_attachments": _check_attachments(raw_msg),
-            "attachment_names": _get_attachment_names(raw_msg),
+            "has_attachments": bool(attachment_names),
+            "attachment_names": attachment_names,
             "requires_approval": False,
         }
         msg_dict["priority"] = self._classify_priority(msg_dict)
@@ -235,90 +373,28 @@ class GmailWatcher(BaseWatcher):
     def _classify_priority(self, msg: dict) -> str:
         """Determine priority from Gmail labels and subject keywords."""
         labels: list[str] = msg.get("labels", [])
-        subject: str = msg.get("subject", "").lower()
 
         if "IMPORTANT" in labels:
-            for keyword in self._priority_keywords:
-                if keyword in subject:
-                    return "critical"
+            subject: str = msg.get("subject", "").lower()
+            if self._priority_re is not None and self._priority_re.search(subject):
+                return "critical"
             return "high"
 
-        if "CATEGORY_PROMOTIONS" in labels or "CATEGORY_SOCIAL" in labels:
-            return "low"
-
-        if "SPAM" in labels:
+        if not _LOW_PRIORITY_LABELS.isdisjoint(labels):
             return "low"
 
         return "medium"
 
     def _generate_dry_run_data(self) -> list[dict]:
         """Return 3 sample emails with varying priorities for DRY_RUN mode."""
+        # Fresh list fields so callers can mutate items without touching the samples.
         return [
             {
-                "id": "dry_run_001",
-                "thread_id": "dry_thread_001",
-                "type": "email",
-                "source": "Client A <client@example.com>",
-                "sender_email": "client@example.com",
-                "sender_name": "Client A",
-                "to": "employee@company.com",
-                "subject": "URGENT: Overdue Invoice #2024-001",
-                "received": "2026-02-26T09:00:00+00:00",
-                "content": (
-                    "Hello,\n\nThis is an urgent reminder that invoice #2024-001 "
-                    "for $5,000 is now 30 days overdue. Please process this "
-                    "immediately or we will have to escalate.\n\nBest regards,\nClient A"
-                ),
-                "snippet": "URGENT: Invoice #2024-001 is 30 days overdue...",
-                "labels": ["IMPORTANT", "INBOX"],
-                "has_attachments": False,
-                "attachment_names": [],
-                "priority": "critical",
-                "requires_approval": False,
-            },
-            {
-                "id": "dry_run_002",
-                "thread_id": "dry_thread_002",
-                "type": "email",
-                "source": "Jane Smith <jane.smith@example.com>",
-                "sender_email": "jane.smith@example.com",
-                "sender_name": "Jane Smith",
-                "to": "employee@company.com",
-                "subject": "Q1 Strategy Meeting — Can you attend Thursday?",
-                "received": "2026-02-26T10:00:00+00:00",
-                "content": (
-                    "Hi,\n\nI'd like to schedule a Q1 strategy meeting for Thursday "
-                    "at 2pm. Please let me know if you're available and I'll send a "
-                    "calendar invite.\n\nBest,\nJane"
-                ),
-                "snippet": "Q1 strategy meeting Thursday 2pm...",
-                "labels": ["IMPORTANT", "INBOX"],
-                "has_attachments": False,
-                "attachment_names": [],
-                "priority": "high",
-                "requires_approval": False,
-            },
-            {
-                "id": "dry_run_003",
-                "thread_id": "dry_thread_003",
-                "type": "email",
-                "source": "Newsletter <newsletter@deals.example.com>",
-                "sender_email": "newsletter@deals.example.com",
-                "sender_name": "Newsletter",
-                "to": "employee@company.com",
-                "subject": "50% off all products this weekend only!",
-                "received": "2026-02-26T08:00:00+00:00",
-                "content": (
-                    "Don't miss out! This weekend only, get 50% off all products. "
-                    "Use code WEEKEND50 at checkout. Shop now at example.com/deals"
-                ),
-                "snippet": "50% off all products this weekend only!",
-                "labels": ["CATEGORY_PROMOTIONS", "INBOX"],
-                "has_attachments": False,
-                "attachment_names": [],
-                "priority": "low",
-                "requires_approval": False,
-            },
+                **sample,
+                "labels": list(sample["labels"]),
+                "attachment_names": list(sample["attachment_names"]),
+            }
+            for sample in _DRY_RUN_SAMPLES
         ]
 
     def shutdown(self) -> None:
@@ -332,95 +408,104 @@ class GmailWatcher(BaseWatcher):
 # ---------------------------------------------------------------------------
 
 
+@functools.cache
+def _shared_gmail_service(credentials_path: Path, token_path: Path) -> "Resource":
+    """
+    Build (or reuse) the Gmail service for a credentials/token pair.
+
+    Watchers in one process share the discovery document and HTTP
+    connection pool instead of re-authenticating per instance.
+    """
+    return get_gmail_service(credentials_path, token_path)
+
+
+def _extract_headers(payload: dict) -> dict[str, str]:
+    """Map lower-cased header names to values in a single pass."""
+    return {h["name"].lower(): h["value"] for h in payload.get("headers", [])}
+
+
 def _parse_gmail_date(date_str: str) -> str:
     """Convert an email Date header string to ISO 8601 format."""
-    if not date_str:
-        return datetime.now(tz=timezone.utc).isoformat()
-    try:
-        dt = parsedate_to_datetime(date_str)
-        return dt.isoformat()
-    except Exception:
+    parsed = _parse_date_header(date_str) if date_str else None
+    if parsed is None:
         return datetime.now(tz=timezone.utc).isoformat()
+    return parsed
 
 
-def _extract_body(msg: dict) -> str:
+@functools.lru_cache(maxsize=4096)
+def _parse_date_header(date_str: str) -> str | None:
     """
-    Extract plain-text body from a Gmail API message.
+    Parse an RFC 2822 Date header to ISO 8601, or None if unparseable.
 
-    Priority: text/plain > text/html (stripped) > snippet > '(No content)'
+    Cached because threads and bulk mail repeat Date strings; the
+    time-dependent fallback stays in the uncached caller.
     """
-    payload = msg.get("payload", {})
-
-    plain = _find_part(payload, "text/plain")
-    if plain:
-        return plain
-
-    html = _find_part(payload, "text/html")
-    if html:
-        return _strip_html(html)
-
-    snippet = msg.get("snippet", "")
-    return snippet if snippet else "(No content)"
-
+    try:
+        return parsedate_to_datetime(date_str).isoformat()
+    except Exception:
+        return None
 
-def _find_part(part: dict, mime_type: str) -> str:
-    """Recursively search MIME parts for the given mime_type and decode."""
-    if part.get("mimeType") == mime_type:
-        data = part.get("body", {}).get("data", "")
-        if data:
-            return base64.urlsafe_b64decode(data + "==").decode(
-                "utf-8", errors="replace"
-            )
 
-    for sub_part in part.get("parts", []):
-        result = _find_part(sub_part, mime_type)
-        if result:
-            return result
+def _select_body(plain_data: str, html_data: str, snippet: str) -> str:
+    """Decode the preferred body from raw part data, falling back to snippet."""
+    if plain_data:
+        plain = _decode_b64url(plain_data)
+        if plain:
+            return plain
 
-    return ""
+    if html_data:
+        html = _decode_b64url(html_data)
+        if html:
+            return _strip_html(html)
 
+    return snippet if snippet else "(No content)"
 
-def _strip_html(html: str) -> str:
-    """Remove HTML tags and normalize whitespace."""
-    html = re.sub(
-        r"<(script|style)[^>]*>.*?</(script|style)>",
-        "",
-        html,
-        flags=re.DOTALL | re.IGNORECASE,
-    )
-    text = re.sub(r"<[^>]+>", " ", html)
-    return re.sub(r"\s+", " ", text).strip()
 
+def _decode_b64url(data: str) -> str:
+    """Decode a URL-safe base64 Gmail body to text."""
+    raw = binascii.a2b_base64(data.encode("ascii").translate(_B64_TRANS) + b"==")
+    return raw.decode("utf-8", errors="replace")
 
-def _check_attachments(msg: dict) -> bool:
-    """Return True if the message payload contains any attachments."""
-    return _has_attachment(msg.get("payload", {}))
 
+def _iter_parts(payload: dict) -> Iterator[dict]:
+    """Yield every MIME part depth-first in document order, without recursion."""
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        yield part
+        stack.extend(reversed(part.get("parts", [])))
 
-def _has_attachment(part: dict) -> bool:
-    """Recursively check if any MIME part is an attachment."""
-    if part.get("filename"):
-        return True
-    for sub_part in part.get("parts", []):
-        if _has_attachment(sub_part):
-            return True
-    return False
 
+def _walk_parts(payload: dict) -> tuple[str, str, list[str]]:
+    """
+    Visit the MIME tree once.
 
-def _get_attachment_names(msg: dict) -> list[str]:
-    """Return a list of attachment filenames from the message."""
+    Returns the raw base64 data of the first non-empty text/plain and
+    text/html parts, plus every non-empty attachment filename in order.
+    Attachments (parts with a filename) are never body candidates, so an
+    attached .txt or .html is not mistaken for the message body.
+    Decoding is left to the caller so an unused html part is never decoded.
+    """
+    plain_data = ""
+    html_data = ""
     names: list[str] = []
-    _collect_attachment_names(msg.get("payload", {}), names)
-    return names
+    for part in _iter_parts(payload):
+        filename = part.get("filename", "")
+        if filename:
+            names.append(filename)
+            continue
+        mime_type = part.get("mimeType")
+        if mime_type == "text/plain" and not plain_data:
+            plain_data = part.get("body", {}).get("data", "")
+        elif mime_type == "text/html" and not html_data:
+            html_data = part.get("body", {}).get("data", "")
+    return plain_data, html_data, names
 
 
-def _collect_attachment_names(part: dict, names: list[str]) -> None:
-    """Recursively collect non-empty filenames from MIME parts."""
-    filename = part.get("filename", "")
-    if filename:
-        names.append(filename)
-    for sub_part in part.get("parts", []):
-        _collect_attachment_names(sub_part, names)
+def _strip_html(html: str) -> str:
+    """Remove HTML tags and normalize whitespace."""
+    text = _TAG_RE.sub(" ", _SCRIPT_STYLE_RE.sub("", html))
+    return _WHITESPACE_RE.sub(" ", text).strip()
 
 
 # ---------------------------------------------------------------------------
@@ -1,25 +1,44 @@
 """Shared pytest fixtures for AI Employee tests."""
 
+from pathlib import Path
+
 import pytest
 
+# Required top-level vault directories
+_VAULT_FOLDERS: tuple[str, ...] = (
+    "Needs_Action",
+    "Plans",
+    "Pending_Approval",
+    "Approved",
+    "Rejected",
+    "Done",
+    "Logs",
+    "Briefings",
+    "Accounting",
+    "Drop",
+    ".state",
+)
+
+
+def _build_vault(root: Path) -> Path:
+    """Create the vault folder skeleton under root and return root."""
+    for folder in _VAULT_FOLDERS:
+        (root / folder).mkdir(parents=True, exist_ok=True)
+    return root
+
 
 @pytest.fixture
 def tmp_vault(tmp_path):
     """Create a temporary vault structure for testing."""
-    # Required top-level directories
-    for folder in (
-        "Needs_Action",
-        "Plans",
-        "Pending_Approval",
-        "Approved",
-        "Rejected",
-        "Done",
-        "Logs",
-        "Briefings",
-        "Accounting",
-        "Drop",
-        ".state",
-    ):
-        (tmp_path / folder).mkdir(parents=True, exist_ok=True)
-
-    return tmp_path
+    return _build_vault(tmp_path)
+
+
+@pytest.fixture(scope="module")
+def tmp_vault_module(tmp_path_factory):
+    """
+    Vault shared by every test in a module.
+
+    Only for tests that never write items, state, or logs into the vault —
+    anything that does must use the per-test tmp_vault.
+    """
+    return _build_vault(tmp_path_factory.mktemp("vault"))
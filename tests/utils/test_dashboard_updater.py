@@ -192,7 +192,7 @@ class TestAddActivityLog:
         archive_file = dashboard_file / "Logs" / f"dashboard_archive_{today}.json"
         assert archive_file.exists()
 
-        archived = json.loads(archive_file.read_text(encoding="utf-8"))
+        archived = json.loads(archive_file.read_bytes())
         assert len(archived) == 50
 
         # After rollover, only the newly added row should be in the table
@@ -486,7 +486,7 @@ class TestRolloverActivityLog:
         today = datetime.now(tz=timezone.utc).strftime("%Y-%m-%d")
         archive = dashboard_file / "Logs" / f"dashboard_archive_{today}.json"
         assert archive.exists()
-        data = json.loads(archive.read_text(encoding="utf-8"))
+        data = json.loads(archive.read_bytes())
         assert len(data) == 5
 
     def test_rollover_clears_table(self, dashboard_file):
@@ -515,7 +515,7 @@ class TestRolloverActivityLog:
 
 
 class TestReadDashboard:
-    def test_read_dashboard_missing_raises(self, tmp_vault):
+    def test_read_dashboard_missing_raises(self, tmp_vault_module):
         """FileNotFoundError raised when Dashboard.md is absent."""
         with pytest.raises(FileNotFoundError, match="scaffolding"):
-            _read_dashboard(tmp_vault)
+            _read_dashboard(tmp_vault_module)
@@ -3,13 +3,13 @@
 import json
 from datetime import datetime, timezone
 from pathlib import Path
-from unittest.mock import patch
 
 import pytest
 import yaml
 
 from scripts.utils.vault_helpers import (
     append_json_log,
+    extend_json_log,
     is_dry_run,
     read_frontmatter,
     sanitize_filename,
@@ -54,6 +54,12 @@ class TestWriteActionFile:
         assert parsed["priority"] == "high"
         assert parsed["requires_approval"] is True
 
+    def test_write_action_file_keeps_emoji_unescaped(self, tmp_path):
+        subject = "\N{FIRE} Flash sale"
+        path = write_action_file(tmp_path, "emoji.md", {"subject": subject}, "body")
+        assert f"subject: {subject}" in path.read_text(encoding="utf-8")
+        assert read_frontmatter(path)["subject"] == subject
+
 
 class TestSanitizeFilename:
     def test_sanitize_removes_illegal_chars(self):
@@ -95,7 +101,7 @@ class TestAppendJsonLog:
         log_file = tmp_path / f"{today}.json"
         assert log_file.exists()
 
-        data = json.loads(log_file.read_text(encoding="utf-8"))
+        data = json.loads(log_file.read_bytes())
         assert data == [entry]
 
     def test_append_json_log_appends_to_existing(self, tmp_path):
@@ -105,7 +111,7 @@ class TestAppendJsonLog:
         append_json_log(tmp_path, e2)
 
         today = datetime.now(tz=timezone.utc).strftime("%Y-%m-%d")
-        data = json.loads((tmp_path / f"{today}.json").read_text(encoding="utf-8"))
+        data = json.loads((tmp_path / f"{today}.json").read_bytes())
         assert len(data) == 2
         assert data[0] == e1
         assert data[1] == e2
@@ -115,6 +121,14 @@ class TestAppendJsonLog:
         append_json_log(log_dir, {"k": "v"})
         assert log_dir.is_dir()
 
+    def test_extend_json_log_appends_batch_in_order(self, tmp_path):
+        append_json_log(tmp_path, {"n": 1})
+        extend_json_log(tmp_path, [{"n": 2}, {"n": 3}])
+
+        today = datetime.now(tz=timezone.utc).strftime("%Y-%m-%d")
+        data = json.loads((tmp_path / f"{today}.json").read_bytes())
+        assert data == [{"n": 1}, {"n": 2}, {"n": 3}]
+
 
 class TestReadFrontmatter:
     def test_read_frontmatter_parses_yaml(self, tmp_path):
@@ -141,25 +155,32 @@ class TestReadFrontmatter:
         # Empty YAML block → None → returns {}
         assert result == {}
 
+    def test_read_frontmatter_unclosed_returns_empty(self, tmp_path):
+        md = tmp_path / "unclosed.md"
+        md.write_text("---\ntype: email\npriority: high\n", encoding="utf-8")
+        assert read_frontmatter(md) == {}
+
+    def test_read_frontmatter_ignores_rules_in_body(self, tmp_path):
+        md = tmp_path / "rules.md"
+        md.write_text("---\ntype: email\n---\n\nAbove\n---\nnot: yaml\n", encoding="utf-8")
+        assert read_frontmatter(md) == {"type": "email"}
+
 
 class TestIsDryRun:
-    def test_is_dry_run_defaults_true(self):
-        with patch.dict("os.environ", {}, clear=True):
-            # Remove DRY_RUN from env entirely
-            import os
-            os.environ.pop("DRY_RUN", None)
-            assert is_dry_run() is True
-
-    def test_is_dry_run_reads_env_false(self):
-        with patch.dict("os.environ", {"DRY_RUN": "false"}):
-            assert is_dry_run() is False
-
-    def test_is_dry_run_reads_env_true(self):
-        with patch.dict("os.environ", {"DRY_RUN": "true"}):
-            assert is_dry_run() is True
-
-    def test_is_dry_run_case_insensitive(self):
-        with patch.dict("os.environ", {"DRY_RUN": "FALSE"}):
-            assert is_dry_run() is False
-        with patch.dict("os.environ", {"DRY_RUN": "TRUE"}):
-            assert is_dry_run() is True
+    def test_is_dry_run_defaults_true(self, monkeypatch):
+        monkeypatch.delenv("DRY_RUN", raising=False)
+        assert is_dry_run() is True
+
+    def test_is_dry_run_reads_env_false(self, monkeypatch):
+        monkeypatch.setenv("DRY_RUN", "false")
+        assert is_dry_run() is False
+
+    def test_is_dry_run_reads_env_true(self, monkeypatch):
+        monkeypatch.setenv("DRY_RUN", "true")
+        assert is_dry_run() is True
+
+    def test_is_dry_run_case_insensitive(self, monkeypatch):
+        monkeypatch.setenv("DRY_RUN", "FALSE")
+        assert is_dry_run() is False
+        monkeypatch.setenv("DRY_RUN", "TRUE")
+        assert is_dry_run() is True
@@ -1,7 +1,6 @@
 """Unit tests for scripts/utils/vault_processor.py."""
 
 import json
-import time
 from datetime import datetime, timezone
 from pathlib import Path
 from unittest.mock import patch
@@ -26,7 +25,7 @@ from scripts.utils.vault_processor import (
 def make_md_file(directory: Path, filename: str, frontmatter: dict, body: str = "Body text.") -> Path:
     """Create a .md file with YAML frontmatter in the given directory."""
     directory.mkdir(parents=True, exist_ok=True)
-    fm_str = yaml.dump(frontmatter, default_flow_style=False, allow_unicode=True)
+    fm_str = yaml.dump(frontmatter, default_flow_style=False)
     content = f"---\n{fm_str}---\n\n{body}"
     file_path = directory / filename
     file_path.write_text(content, encoding="utf-8")
@@ -165,8 +164,8 @@ class TestListFolder:
         items = list_folder(tmp_vault, "Plans")
         assert len(items) == 2
 
-    def test_list_folder_nonexistent_returns_empty(self, tmp_vault):
-        items = list_folder(tmp_vault, "NonExistentFolder")
+    def test_list_folder_nonexistent_returns_empty(self, tmp_vault_module):
+        items = list_folder(tmp_vault_module, "NonExistentFolder")
         assert items == []
 
     def test_list_folder_skips_gitkeep(self, tmp_vault):
@@ -247,7 +246,7 @@ class TestMoveFile:
         log_file = populated_vault / "Logs" / f"{today}.json"
         assert log_file.exists()
 
-        data = json.loads(log_file.read_text(encoding="utf-8"))
+        data = json.loads(log_file.read_bytes())
         assert len(data) == 1
         assert data[0]["action_type"] == "file_move"
         assert data[0]["result"] == "success"
@@ -263,16 +262,16 @@ class TestMoveFile:
         def failing_copy2(src, dst):
             raise OSError("Simulated copy failure")
 
-        with patch("scripts.utils.vault_processor.shutil.copy2", side_effect=failing_copy2):
+        with patch.object(shutil_module, "copy2", side_effect=failing_copy2):
             with pytest.raises(OSError, match="Simulated copy failure"):
                 move_file(populated_vault, source_relative, "Done")
 
         # Source must still exist after failed copy
         assert source_path.exists()
 
-    def test_move_file_nonexistent_raises(self, tmp_vault):
+    def test_move_file_nonexistent_raises(self, tmp_vault_module):
         with pytest.raises(FileNotFoundError):
-            move_file(tmp_vault, "Needs_Action/email/NONEXISTENT.md", "Done")
+            move_file(tmp_vault_module, "Needs_Action/email/NONEXISTENT.md", "Done")
 
     def test_move_file_preserves_filename(self, populated_vault):
         source = "Needs_Action/email/EMAIL_001.md"
@@ -328,9 +327,9 @@ class TestGetQueueCounts:
         counts = get_queue_counts(tmp_vault)
         assert counts["Plans"] == 0
 
-    def test_get_queue_counts_missing_folder_returns_zero(self, tmp_vault):
+    def test_get_queue_counts_missing_folder_returns_zero(self, tmp_vault_module):
         """Non-existent folders return 0, not an error."""
-        counts = get_queue_counts(tmp_vault)
+        counts = get_queue_counts(tmp_vault_module)
         assert counts["In_Progress"] == 0
 
 
@@ -1,12 +1,12 @@
 """Unit tests for BaseWatcher abstract base class."""
 
 import json
+from collections.abc import Iterator
 from pathlib import Path
-from unittest.mock import patch
 
 import pytest
 
-from scripts.watchers.base_watcher import BaseWatcher, _STATE_MAX_IDS, _STATE_TRIM_TO
+from scripts.watchers.base_watcher import BaseWatcher
 
 
 # ---------------------------------------------------------------------------
@@ -21,8 +21,9 @@ class ConcreteWatcher(BaseWatcher):
         self._fail_create: bool = fail_create
         super().__init__(*args, **kwargs)
 
-    def check_for_updates(self) -> list[dict]:
-        return list(self._canned_items)
+    def check_for_updates(self) -> Iterator[dict]:
+        # A one-shot iterator: run_once must not need more than one pass
+        return iter(self._canned_items)
 
     def create_action_file(self, item: dict) -> Path:
         if self._fail_create:
@@ -33,17 +34,29 @@ class ConcreteWatcher(BaseWatcher):
         return out
 
 
+_SAMPLE_TEMPLATE: dict = {
+    "id": "id-1",
+    "type": "email",
+    "source": "test@example.com",
+    "subject": "Test Subject",
+    "content": "Body text",
+    "priority": "medium",
+    "received": "2026-02-26T10:30:00+00:00",
+    "requires_approval": False,
+}
+
+
+# Pre-serialized state file, as written by a previous run.
+_STATE_BYTES = (
+    b'{"processed_ids": ["id1", "id2", "id3"], '
+    b'"last_updated": "2026-02-27T10:00:00+00:00"}'
+)
+
+
 def _sample_item(item_id: str = "id-1") -> dict:
-    return {
-        "id": item_id,
-        "type": "email",
-        "source": "test@example.com",
-        "subject": "Test Subject",
-        "content": "Body text",
-        "priority": "medium",
-        "received": "2026-02-26T10:30:00+00:00",
-        "requires_approval": False,
-    }
+    item = _SAMPLE_TEMPLATE.copy()
+    item["id"] = item_id
+    return item
 
 
 # ---------------------------------------------------------------------------
@@ -51,58 +64,78 @@ def _sample_item(item_id: str = "id-1") -> dict:
 # ---------------------------------------------------------------------------
 
 class TestBaseWatcherInit:
-    def test_init_creates_directories(self, tmp_vault):
-        w = ConcreteWatcher(tmp_vault, subdomain="email", watcher_name="test")
-        assert (tmp_vault / "Needs_Action" / "email").is_dir()
-        assert (tmp_vault / "Logs").is_dir()
-        assert (tmp_vault / ".state").is_dir()
+    def test_init_creates_directories(self, tmp_path):
+        # Bare tmp_path, not tmp_vault: the watcher itself must create these.
+        w = ConcreteWatcher(tmp_path, subdomain="email", watcher_name="test")
+        assert (tmp_path / "Needs_Action" / "email").is_dir()
+        assert (tmp_path / "Logs").is_dir()
+        assert (tmp_path / ".state").is_dir()
 
     def test_init_validates_vault_path(self, tmp_path):
         nonexistent = tmp_path / "no_such_dir"
         with pytest.raises(ValueError, match="vault_path"):
             ConcreteWatcher(nonexistent, watcher_name="test")
 
-    def test_init_respects_minimum_interval(self, tmp_vault):
-        w = ConcreteWatcher(tmp_vault, check_interval=5, watcher_name="test")
+    def test_init_respects_minimum_interval(self, tmp_vault_module):
+        w = ConcreteWatcher(tmp_vault_module, check_interval=5, watcher_name="test")
         assert w.check_interval == 30
 
-    def test_init_interval_above_minimum_unchanged(self, tmp_vault):
-        w = ConcreteWatcher(tmp_vault, check_interval=60, watcher_name="test")
+    def test_init_interval_above_minimum_unchanged(self, tmp_vault_module):
+        w = ConcreteWatcher(tmp_vault_module, check_interval=60, watcher_name="test")
         assert w.check_interval == 60
 
 
+@pytest.fixture(scope="class")
+def dedup_watcher(tmp_path_factory):
+    """One watcher per class; these tests only touch _processed_ids."""
+    return ConcreteWatcher(tmp_path_factory.mktemp("dedup_vault"), watcher_name="test")
+
+
 class TestDeduplication:
-    def test_should_process_new_item(self, tmp_vault):
-        w = ConcreteWatcher(tmp_vault, watcher_name="test")
-        assert w.should_process("brand-new-id") is True
+    @pytest.fixture(autouse=True)
+    def _reset_processed(self, dedup_watcher):
+        dedup_watcher._processed_ids.clear()
 
-    def test_should_process_duplicate(self, tmp_vault):
-        w = ConcreteWatcher(tmp_vault, watcher_name="test")
-        w.mark_processed("known-id")
-        assert w.should_process("known-id") is False
+    def test_should_process_new_item(self, dedup_watcher):
+        assert dedup_watcher.should_process("brand-new-id") is True
 
-    def test_mark_processed_persists(self, tmp_vault):
-        w = ConcreteWatcher(tmp_vault, watcher_name="test")
-        w.mark_processed("persisted-id")
+    def test_should_process_duplicate(self, dedup_watcher):
+        dedup_watcher.mark_processed("known-id")
+        assert dedup_watcher.should_process("known-id") is False
 
-        # Re-load from disk
-        state_file = tmp_vault / ".state" / "test_processed.json"
-        assert state_file.exists()
-        data = json.loads(state_file.read_text(encoding="utf-8"))
-        assert "persisted-id" in data["processed_ids"]
+    def test_mark_processed_persists(self, dedup_watcher):
+        dedup_watcher.mark_processed("persisted-id")
 
-    def test_state_file_cap(self, tmp_vault):
+        # Read back through _load_state, not the in-memory dict
+        reloaded = ConcreteWatcher(dedup_watcher.vault_path, watcher_name="test")
+        assert reloaded.should_process("persisted-id") is False
+
+    def test_state_file_format(self, dedup_watcher):
+        """The state file is compact JSON with processed_ids and a last_updated stamp."""
+        dedup_watcher.mark_processed("persisted-id")
+
+        state_file = dedup_watcher.vault_path / ".state" / "test_processed.json"
+        raw = state_file.read_bytes()
+        assert b"\n" not in raw
+        data = json.loads(raw)
+        assert data["processed_ids"] == ["persisted-id"]
+        assert "last_updated" in data
+
+    def test_state_file_cap(self, tmp_vault, monkeypatch):
         """When exceeding _STATE_MAX_IDS, oldest entries are dropped."""
+        # Only the trim logic is under test, not the production cap values.
+        max_ids, trim_to = 100, 50
+        monkeypatch.setattr("scripts.watchers.base_watcher._STATE_MAX_IDS", max_ids)
+        monkeypatch.setattr("scripts.watchers.base_watcher._STATE_TRIM_TO", trim_to)
+
         w = ConcreteWatcher(tmp_vault, watcher_name="test")
         # Fill up beyond the cap
-        ids = [f"id-{i}" for i in range(_STATE_MAX_IDS + 1)]
-        for item_id in ids:
-            w._processed_ids.append(item_id)
+        w._processed_ids = dict.fromkeys(f"id-{i}" for i in range(max_ids + 1))
         # Trigger cap logic via mark_processed with one more
         w.mark_processed("final-id")
-        # After appending "final-id" (10002 total) the list is trimmed to the last
-        # _STATE_TRIM_TO entries, so length == _STATE_TRIM_TO exactly.
-        assert len(w._processed_ids) == _STATE_TRIM_TO
+        # After appending "final-id" (max_ids + 2 total) the list is trimmed to the
+        # last trim_to entries, so length == trim_to exactly.
+        assert len(w._processed_ids) == trim_to
         # Oldest entries should be gone
         assert "id-0" not in w._processed_ids
         assert "final-id" in w._processed_ids
@@ -136,6 +169,55 @@ class TestRunOnce:
         # Item must NOT be marked processed if create failed
         assert w.should_process("err-id") is True
 
+    def test_run_once_logs_all_items_in_one_file(self, tmp_vault):
+        items = [_sample_item("l1"), _sample_item("l2"), _sample_item("l3")]
+        w = ConcreteWatcher(tmp_vault, canned_items=items, watcher_name="test")
+        w.run_once()
+
+        log_files = list((tmp_vault / "Logs").glob("*.json"))
+        assert len(log_files) == 1
+        entries = json.loads(log_files[0].read_bytes())
+        assert [e["output_file"].rsplit("_", 1)[-1] for e in entries] == [
+            "l1.md",
+            "l2.md",
+            "l3.md",
+        ]
+
+    def test_run_once_saves_state_once_per_cycle(self, tmp_vault, monkeypatch):
+        items = [_sample_item("s1"), _sample_item("s2"), _sample_item("s3")]
+        w = ConcreteWatcher(tmp_vault, canned_items=items, watcher_name="test")
+        saves = []
+        monkeypatch.setattr(w, "_save_state", lambda: saves.append(1))
+
+        w.run_once()
+
+        assert len(saves) == 1
+        assert {"s1", "s2", "s3"} <= set(w._processed_ids)
+
+    def test_run_once_persists_processed_ids(self, tmp_vault):
+        items = [_sample_item("p1"), _sample_item("p2")]
+        ConcreteWatcher(tmp_vault, canned_items=items, watcher_name="test").run_once()
+
+        reloaded = ConcreteWatcher(tmp_vault, watcher_name="test")
+        assert reloaded.should_process("p1") is False
+        assert reloaded.should_process("p2") is False
+
+    def test_run_once_without_new_items_writes_no_log(self, tmp_vault):
+        w = ConcreteWatcher(tmp_vault, canned_items=[], watcher_name="test")
+        w.run_once()
+        assert list((tmp_vault / "Logs").glob("*.json")) == []
+
+    def test_run_once_duplicate_cycle_leaves_files_untouched(self, tmp_vault):
+        items = [_sample_item("d1"), _sample_item("d2")]
+        w = ConcreteWatcher(tmp_vault, canned_items=items, watcher_name="test")
+        w.run_once()
+        (log_file,) = (tmp_vault / "Logs").glob("*.json")
+        state_file = tmp_vault / ".state" / "test_processed.json"
+        before = (log_file.stat().st_mtime_ns, state_file.stat().st_mtime_ns)
+
+        assert w.run_once() == []
+        assert (log_file.stat().st_mtime_ns, state_file.stat().st_mtime_ns) == before
+
     def test_run_once_returns_list_of_paths(self, tmp_vault):
         items = [_sample_item("p1"), _sample_item("p2")]
         w = ConcreteWatcher(tmp_vault, canned_items=items, watcher_name="test")
@@ -143,21 +225,29 @@ class TestRunOnce:
         assert all(isinstance(p, Path) for p in created)
 
 
-class TestLogAction:
-    def test_log_action_creates_log_file(self, tmp_vault):
-        item = _sample_item("log-id")
-        w = ConcreteWatcher(tmp_vault, canned_items=[item], watcher_name="logtest")
-        w.run_once()
+@pytest.fixture(scope="module")
+def log_entries(tmp_path_factory):
+    """Run a single logtest cycle once per module and return the parsed log."""
+    vault = tmp_path_factory.mktemp("log_vault")
+    item = _sample_item("log-id")
+    w = ConcreteWatcher(vault, canned_items=[item], watcher_name="logtest")
+    w.run_once()
 
-        from datetime import datetime, timezone
+    # Locate the daily log from the entry itself rather than a second clock
+    # read, so a run that straddles midnight UTC cannot miss the file.
+    log_files = list((vault / "Logs").glob("*.json"))
+    assert len(log_files) == 1
+    entries = json.loads(log_files[0].read_bytes())
+    assert log_files[0].stem == entries[0]["timestamp"][:10]
+    return entries
 
-        today = datetime.now(tz=timezone.utc).strftime("%Y-%m-%d")
-        log_file = tmp_vault / "Logs" / f"{today}.json"
-        assert log_file.exists()
 
-        entries = json.loads(log_file.read_text(encoding="utf-8"))
-        assert len(entries) >= 1
-        entry = entries[0]
+class TestLogAction:
+    def test_log_action_creates_log_file(self, log_entries):
+        assert len(log_entries) >= 1
+
+    def test_log_action_entry_fields(self, log_entries):
+        entry = log_entries[0]
         assert entry["action_type"] == "watcher_detect"
         assert entry["actor"] == "logtest"
         assert entry["result"] == "success"
@@ -167,34 +257,46 @@ class TestLogAction:
 
 
 class TestDryRunFlag:
-    def test_dry_run_flag_true_by_default(self, tmp_vault):
-        with patch.dict("os.environ", {"DRY_RUN": "true"}):
-            w = ConcreteWatcher(tmp_vault, watcher_name="test")
-            assert w.is_dry_run is True
+    def test_dry_run_flag_true_by_default(self, tmp_vault_module, monkeypatch):
+        monkeypatch.delenv("DRY_RUN", raising=False)
+        w = ConcreteWatcher(tmp_vault_module, watcher_name="test")
+        assert w.is_dry_run is True
 
-    def test_dry_run_flag_false(self, tmp_vault):
-        with patch.dict("os.environ", {"DRY_RUN": "false"}):
-            w = ConcreteWatcher(tmp_vault, watcher_name="test")
-            assert w.is_dry_run is False
+    @pytest.mark.parametrize("env_value,expected", [("true", True), ("false", False)])
+    def test_dry_run_flag_from_env(self, tmp_vault_module, monkeypatch, env_value, expected):
+        monkeypatch.setenv("DRY_RUN", env_value)
+        w = ConcreteWatcher(tmp_vault_module, watcher_name="test")
+        assert w.is_dry_run is expected
 
 
 class TestShutdown:
     def test_shutdown_saves_state(self, tmp_vault):
         w = ConcreteWatcher(tmp_vault, watcher_name="shutdown_test")
-        w._processed_ids = ["a", "b", "c"]
+        w._processed_ids = dict.fromkeys(["a", "b", "c"])
+        state_file = tmp_vault / ".state" / "shutdown_test_processed.json"
+        assert not state_file.exists()
+
         w.shutdown()
 
-        state_file = tmp_vault / ".state" / "shutdown_test_processed.json"
-        data = json.loads(state_file.read_text(encoding="utf-8"))
-        assert set(data["processed_ids"]) == {"a", "b", "c"}
+        assert state_file.exists()
+        # Read back through _load_state, not the in-memory dict
+        reloaded = ConcreteWatcher(tmp_vault, watcher_name="shutdown_test")
+        assert set(reloaded._processed_ids) == {"a", "b", "c"}
 
 
 class TestStateFileRecovery:
+    def test_existing_state_file_is_loaded(self, tmp_vault):
+        (tmp_vault / ".state" / "restored_processed.json").write_bytes(_STATE_BYTES)
+
+        w = ConcreteWatcher(tmp_vault, watcher_name="restored")
+        assert list(w._processed_ids) == ["id1", "id2", "id3"]
+        assert w.should_process("id2") is False
+
     def test_corrupted_state_file_resets_to_empty(self, tmp_vault):
         state_dir = tmp_vault / ".state"
         state_dir.mkdir(parents=True, exist_ok=True)
         state_file = state_dir / "corrupt_processed.json"
-        state_file.write_text("NOT VALID JSON{{{", encoding="utf-8")
+        state_file.write_bytes(b"NOT VALID JSON{{{")
 
         w = ConcreteWatcher(tmp_vault, watcher_name="corrupt")
-        assert w._processed_ids == []
+        assert w._processed_ids == {}
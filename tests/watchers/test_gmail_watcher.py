@@ -2,21 +2,20 @@
 
 import base64
 import json
-import os
 from datetime import datetime, timezone
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
+import httplib2
 import pytest
-import yaml
 from googleapiclient.errors import HttpError
 
+import scripts.watchers.gmail_watcher as gmail_module
+from scripts.utils.vault_helpers import read_frontmatter
 from scripts.watchers.gmail_watcher import (
     GmailWatcher,
-    _check_attachments,
-    _extract_body,
-    _get_attachment_names,
     _parse_gmail_date,
+    _shared_gmail_service,
     _strip_html,
 )
 
@@ -31,10 +30,8 @@ def _encode(text: str) -> str:
 
 
 def _make_http_error(status: int) -> HttpError:
-    """Create a mock HttpError with the given HTTP status code."""
-    resp = MagicMock()
-    resp.status = status
-    return HttpError(resp, b"error body")
+    """Create an HttpError with the given HTTP status code."""
+    return HttpError(httplib2.Response({"status": status}), b"error body")
 
 
 def _make_gmail_message(
@@ -83,15 +80,97 @@ def _make_gmail_message(
     }
 
 
+# Message stubs as returned by messages().list; tests slice pages from this.
+# The watcher only reads their "id", so sharing them across tests is safe.
+_MESSAGE_REFS: tuple[dict, ...] = tuple({"id": f"msg_{i}"} for i in range(60))
+
+
+class _FakeBatch:
+    """Stand-in for BatchHttpRequest: runs each queued request on execute()."""
+
+    def __init__(self, callback) -> None:
+        self._callback = callback
+        self._requests: list[tuple[str, object]] = []
+
+    def add(self, request, request_id: str) -> None:
+        self._requests.append((request_id, request))
+
+    def execute(self) -> None:
+        for request_id, request in self._requests:
+            try:
+                response = request.execute()
+            except HttpError as exc:
+                self._callback(request_id, None, exc)
+            else:
+                self._callback(request_id, response, None)
+
+
+class _FakeRequest:
+    """Stand-in for HttpRequest: execute() returns or raises a canned outcome."""
+
+    def __init__(self, outcome) -> None:
+        self._outcome = outcome
+
+    def execute(self):
+        if isinstance(self._outcome, BaseException):
+            raise self._outcome
+        return self._outcome
+
+
+class FakeGmailService:
+    """
+    Plain-object stand-in for the Gmail API service.
+
+    Exposes just the chain the watcher uses
+    (users().messages().list/get, new_batch_http_request) and records calls
+    as plain attributes instead of MagicMock bookkeeping.
+
+    list_pages: responses (or exceptions) returned by successive list() calls.
+    messages: per-ID get() responses (or exceptions); unknown IDs get a
+        default message carrying that ID.
+    """
+
+    def __init__(
+        self,
+        list_pages: list | None = None,
+        messages: dict | None = None,
+    ) -> None:
+        self._list_pages = list(list_pages or [{"messages": []}])
+        self._messages = messages or {}
+        self.list_calls: list[dict] = []
+        self.get_ids: list[str] = []
+        self.batch_count = 0
+
+    def users(self) -> "FakeGmailService":
+        return self
+
+    def messages(self) -> "FakeGmailService":
+        return self
+
+    def list(self, **kwargs) -> _FakeRequest:
+        self.list_calls.append(kwargs)
+        return _FakeRequest(self._list_pages[len(self.list_calls) - 1])
+
+    def get(self, userId: str, id: str, format: str) -> _FakeRequest:
+        self.get_ids.append(id)
+        return _FakeRequest(self._messages.get(id) or _make_gmail_message(msg_id=id))
+
+    def new_batch_http_request(self, callback) -> _FakeBatch:
+        self.batch_count += 1
+        return _FakeBatch(callback)
+
+
 # ---------------------------------------------------------------------------
 # Fixtures
 # ---------------------------------------------------------------------------
 
 
-@pytest.fixture
-def mock_gmail_service():
-    """Return a mock Gmail API service with canned responses."""
-    return MagicMock()
+@pytest.fixture(autouse=True)
+def _clear_service_cache():
+    """Each test patches get_gmail_service; never hand out a cached client."""
+    _shared_gmail_service.cache_clear()
+    yield
+    _shared_gmail_service.cache_clear()
 
 
 @pytest.fixture
@@ -101,28 +180,58 @@ def sample_gmail_message():
 
 
 @pytest.fixture
-def gmail_watcher(tmp_vault):
+def dry_run_env(monkeypatch):
+    """Run the test with DRY_RUN=true."""
+    monkeypatch.setenv("DRY_RUN", "true")
+
+
+@pytest.fixture
+def gmail_watcher(tmp_vault, dry_run_env):
     """Create a GmailWatcher in DRY_RUN mode with a tmp vault."""
-    with patch.dict(os.environ, {"DRY_RUN": "true"}):
-        watcher = GmailWatcher(
-            vault_path=tmp_vault,
+    return GmailWatcher(
+        vault_path=tmp_vault,
+        credentials_path="/fake/credentials.json",
+        token_path="/fake/token.json",
+    )
+
+
+@pytest.fixture(scope="class")
+def ro_gmail_watcher(tmp_vault_module):
+    """
+    DRY_RUN GmailWatcher shared by a whole test class.
+
+    For classes that only call pure helpers and never write to the vault.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DRY_RUN", "true")
+        return GmailWatcher(
+            vault_path=tmp_vault_module,
             credentials_path="/fake/credentials.json",
             token_path="/fake/token.json",
         )
-    return watcher
 
 
-def _make_live_watcher(tmp_vault, service: MagicMock) -> GmailWatcher:
-    """Create a GmailWatcher in live mode with an injected mock service."""
-    with patch(
-        "scripts.watchers.gmail_watcher.get_gmail_service", return_value=service
+@pytest.fixture(scope="module")
+def dry_run_items(tmp_vault_module):
+    """The DRY_RUN sample batch, generated once per module for read-only checks."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DRY_RUN", "true")
+        watcher = GmailWatcher(vault_path=tmp_vault_module)
+    return tuple(watcher.check_for_updates())
+
+
+def _make_live_watcher(tmp_vault, service: FakeGmailService) -> GmailWatcher:
+    """Create a GmailWatcher in live mode with an injected fake service."""
+    with (
+        patch.object(gmail_module, "get_gmail_service", return_value=service),
+        pytest.MonkeyPatch.context() as mp,
     ):
-        with patch.dict(os.environ, {"DRY_RUN": "false"}):
-            watcher = GmailWatcher(
-                vault_path=tmp_vault,
-                credentials_path="/fake/creds.json",
-                token_path="/fake/token.json",
-            )
+        mp.setenv("DRY_RUN", "false")
+        watcher = GmailWatcher(
+            vault_path=tmp_vault,
+            credentials_path="/fake/creds.json",
+            token_path="/fake/token.json",
+        )
     return watcher
 
 
@@ -132,61 +241,89 @@ def _make_live_watcher(tmp_vault, service: MagicMock) -> GmailWatcher:
 
 
 class TestInit:
-    def test_init_dry_run_skips_auth(self, tmp_vault):
+    def test_init_dry_run_skips_auth(self, tmp_vault_module, dry_run_env):
         """No Gmail API call is made when DRY_RUN=true."""
-        with patch(
-            "scripts.watchers.gmail_watcher.get_gmail_service"
+        with patch.object(
+            gmail_module, "get_gmail_service"
         ) as mock_auth:
-            with patch.dict(os.environ, {"DRY_RUN": "true"}):
-                watcher = GmailWatcher(
-                    vault_path=tmp_vault,
-                    credentials_path="/fake/creds.json",
-                    token_path="/fake/token.json",
-                )
+            watcher = GmailWatcher(
+                vault_path=tmp_vault_module,
+                credentials_path="/fake/creds.json",
+                token_path="/fake/token.json",
+            )
             mock_auth.assert_not_called()
         assert watcher._service is None
 
-    def test_init_sets_default_query_filter(self, tmp_vault):
+    def test_init_sets_default_query_filter(self, tmp_vault_module, dry_run_env):
         """Default query filter is 'is:unread is:important'."""
-        with patch.dict(os.environ, {"DRY_RUN": "true"}):
-            watcher = GmailWatcher(vault_path=tmp_vault)
+        watcher = GmailWatcher(vault_path=tmp_vault_module)
         assert watcher.query_filter == "is:unread is:important"
 
-    def test_init_reads_env_vars(self, tmp_vault):
+    def test_init_reads_env_vars(self, tmp_vault_module, dry_run_env, monkeypatch):
         """Credentials and token paths are read from environment variables."""
-        with patch.dict(
-            os.environ,
-            {
-                "DRY_RUN": "true",
-                "GMAIL_CREDENTIALS_PATH": "/env/creds.json",
-                "GMAIL_TOKEN_PATH": "/env/token.json",
-            },
-        ):
-            watcher = GmailWatcher(vault_path=tmp_vault)
+        monkeypatch.setenv("GMAIL_CREDENTIALS_PATH", "/env/creds.json")
+        monkeypatch.setenv("GMAIL_TOKEN_PATH", "/env/token.json")
+        watcher = GmailWatcher(vault_path=tmp_vault_module)
         assert watcher._credentials_path == Path("/env/creds.json")
         assert watcher._token_path == Path("/env/token.json")
 
-    def test_init_live_calls_auth(self, tmp_vault, mock_gmail_service):
+    def test_init_sets_default_priority_keywords(self, tmp_vault_module, dry_run_env, monkeypatch):
+        """Without GMAIL_PRIORITY_KEYWORDS the built-in urgent keywords apply."""
+        monkeypatch.delenv("GMAIL_PRIORITY_KEYWORDS", raising=False)
+        watcher = GmailWatcher(vault_path=tmp_vault_module)
+        assert watcher._priority_keywords == ["urgent", "asap", "emergency", "critical"]
+
+    def test_init_live_calls_auth(self, tmp_vault_module, monkeypatch):
         """In live mode, get_gmail_service is called once."""
-        with patch(
-            "scripts.watchers.gmail_watcher.get_gmail_service",
-            return_value=mock_gmail_service,
+        monkeypatch.setenv("DRY_RUN", "false")
+        with patch.object(
+            gmail_module, "get_gmail_service",
+            return_value=FakeGmailService(),
         ) as mock_auth:
-            with patch.dict(os.environ, {"DRY_RUN": "false"}):
-                watcher = GmailWatcher(
-                    vault_path=tmp_vault,
+            watcher = GmailWatcher(
+                vault_path=tmp_vault_module,
+                credentials_path="/fake/creds.json",
+                token_path="/fake/token.json",
+            )
+        mock_auth.assert_called_once()
+        assert watcher._service is not None
+
+    def test_init_live_watchers_share_service(self, tmp_vault_module, monkeypatch):
+        """Watchers with the same credentials reuse one Gmail service."""
+        monkeypatch.setenv("DRY_RUN", "false")
+        with patch.object(
+            gmail_module, "get_gmail_service",
+            side_effect=lambda *_: FakeGmailService(),
+        ) as mock_auth:
+            first, second = (
+                GmailWatcher(
+                    vault_path=tmp_vault_module,
                     credentials_path="/fake/creds.json",
                     token_path="/fake/token.json",
                 )
+                for _ in range(2)
+            )
         mock_auth.assert_called_once()
-        assert watcher._service is not None
+        assert first._service is second._service
+
+    def test_reauth_rebuilds_cached_service(self, tmp_vault_module):
+        """A 401 drops the cached client and builds a fresh one."""
+        stale = FakeGmailService(list_pages=[_make_http_error(401)])
+        fresh = FakeGmailService()
+        watcher = _make_live_watcher(tmp_vault_module, stale)
+
+        with patch.object(
+            gmail_module, "get_gmail_service", return_value=fresh
+        ) as mock_auth:
+            watcher.check_for_updates()
+        mock_auth.assert_called_once()
+        assert watcher._service is fresh
 
-    def test_init_custom_query_filter(self, tmp_vault):
+    def test_init_custom_query_filter(self, tmp_vault_module, dry_run_env):
         """Custom query_filter parameter is stored."""
-        with patch.dict(os.environ, {"DRY_RUN": "true"}):
-            watcher = GmailWatcher(
-                vault_path=tmp_vault, query_filter="is:unread label:invoice"
-            )
+        watcher = GmailWatcher(
+            vault_path=tmp_vault_module, query_filter="is:unread label:invoice"
+        )
         assert watcher.query_filter == "is:unread label:invoice"
 
 
@@ -195,120 +332,154 @@ class TestInit:
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(scope="class")
+def live_watcher(tmp_path_factory):
+    """One live watcher per class; each test attaches its own fake service."""
+    return _make_live_watcher(tmp_path_factory.mktemp("live_vault"), FakeGmailService())
+
+
 class TestCheckForUpdates:
-    def test_check_for_updates_dry_run_returns_samples(self, gmail_watcher):
+    @staticmethod
+    def _attach(watcher: GmailWatcher, service: FakeGmailService) -> GmailWatcher:
+        """Point the shared watcher at service and forget earlier tests' IDs."""
+        watcher._service = service
+        watcher._processed_ids.clear()
+        return watcher
+
+    def test_check_for_updates_dry_run_returns_samples(self, dry_run_items):
         """DRY_RUN mode returns exactly 3 sample items."""
-        items = gmail_watcher.check_for_updates()
-        assert len(items) == 3
-        assert items[0]["id"] == "dry_run_001"
-        assert items[1]["id"] == "dry_run_002"
-        assert items[2]["id"] == "dry_run_003"
+        assert [item["id"] for item in dry_run_items] == [
+            "dry_run_001",
+            "dry_run_002",
+            "dry_run_003",
+        ]
 
-    def test_check_for_updates_live_calls_api(self, tmp_vault, mock_gmail_service):
+    def test_check_for_updates_dry_run_items_are_independent(self, ro_gmail_watcher):
+        """Mutating a returned sample does not leak into the next cycle."""
+        first = ro_gmail_watcher.check_for_updates()
+        first[0]["labels"].append("MUTATED")
+        first[0]["subject"] = "changed"
+
+        second = ro_gmail_watcher.check_for_updates()
+        assert "MUTATED" not in second[0]["labels"]
+        assert second[0]["subject"] != "changed"
+
+    def test_check_for_updates_live_calls_api(self, live_watcher):
         """Live mode calls Gmail API and returns parsed messages."""
-        msg = _make_gmail_message(msg_id="live_msg_001")
-        mock_gmail_service.users().messages().list().execute.return_value = {
-            "messages": [{"id": "live_msg_001"}],
-        }
-        mock_gmail_service.users().messages().get().execute.return_value = msg
+        service = FakeGmailService(
+            list_pages=[{"messages": [{"id": "live_msg_001"}]}]
+        )
 
-        watcher = _make_live_watcher(tmp_vault, mock_gmail_service)
+        watcher = self._attach(live_watcher, service)
         results = watcher.check_for_updates()
 
         assert len(results) == 1
         assert results[0]["id"] == "live_msg_001"
-        mock_gmail_service.users().messages().list.assert_called()
-        mock_gmail_service.users().messages().get.assert_called()
-
-    def test_check_for_updates_skips_processed(self, tmp_vault, mock_gmail_service):
-        """Messages already in the processed set are not returned."""
-        msg_new = _make_gmail_message(msg_id="new_msg")
-        mock_gmail_service.users().messages().list().execute.return_value = {
-            "messages": [{"id": "already_seen"}, {"id": "new_msg"}],
-        }
-        mock_gmail_service.users().messages().get().execute.return_value = msg_new
+        assert len(service.list_calls) == 1
+        assert service.get_ids == ["live_msg_001"]
+
+    def test_check_for_updates_skips_processed(self, live_watcher):
+        """Messages already in the processed set are neither fetched nor returned."""
+        service = FakeGmailService(
+            list_pages=[{"messages": [{"id": "already_seen"}, {"id": "new_msg"}]}]
+        )
 
-        watcher = _make_live_watcher(tmp_vault, mock_gmail_service)
+        watcher = self._attach(live_watcher, service)
         watcher.mark_processed("already_seen")
 
         results = watcher.check_for_updates()
-        result_ids = [r["id"] for r in results]
-        assert "already_seen" not in result_ids
-        assert "new_msg" in result_ids
-
-    def test_check_for_updates_handles_rate_limit(self, tmp_vault, mock_gmail_service):
-        """HttpError 429 returns empty list without crashing."""
-        mock_gmail_service.users().messages().list().execute.side_effect = (
-            _make_http_error(429)
+        assert [r["id"] for r in results] == ["new_msg"]
+        assert service.get_ids == ["new_msg"]
+
+    def test_check_for_updates_batches_fetches(self, live_watcher):
+        """Message bodies are fetched through a single batch request."""
+        service = FakeGmailService(
+            list_pages=[{"messages": list(_MESSAGE_REFS[:5])}]
         )
 
-        watcher = _make_live_watcher(tmp_vault, mock_gmail_service)
+        watcher = self._attach(live_watcher, service)
         results = watcher.check_for_updates()
-        assert results == []
 
-    def test_check_for_updates_handles_auth_error(self, tmp_vault, mock_gmail_service):
-        """HttpError 401 attempts re-auth; raises if re-auth also fails."""
-        mock_gmail_service.users().messages().list().execute.side_effect = (
-            _make_http_error(401)
+        assert len(results) == 5
+        assert service.batch_count == 1
+
+    def test_check_for_updates_skips_failed_fetch(self, live_watcher):
+        """A message whose batched fetch fails is skipped, not fatal."""
+        service = FakeGmailService(
+            list_pages=[{"messages": [{"id": "ok_msg"}, {"id": "bad_msg"}]}],
+            messages={"bad_msg": _make_http_error(500)},
         )
 
-        watcher = _make_live_watcher(tmp_vault, mock_gmail_service)
+        watcher = self._attach(live_watcher, service)
+        results = watcher.check_for_updates()
 
-        with patch(
-            "scripts.watchers.gmail_watcher.get_gmail_service",
-            side_effect=Exception("reauth failed"),
-        ):
-            with pytest.raises(Exception, match="reauth failed"):
-                watcher.check_for_updates()
+        assert [r["id"] for r in results] == ["ok_msg"]
+        assert watcher.should_process("bad_msg") is True
 
-    def test_check_for_updates_handles_forbidden(self, tmp_vault, mock_gmail_service):
-        """HttpError 403 logs an error and returns empty list."""
-        mock_gmail_service.users().messages().list().execute.side_effect = (
-            _make_http_error(403)
-        )
+    @pytest.mark.parametrize(
+        "list_error",
+        [_make_http_error(429), _make_http_error(403), ConnectionError("network down")],
+        ids=["rate_limit", "forbidden", "connection_error"],
+    )
+    def test_check_for_updates_recoverable_error_returns_empty(self, live_watcher, list_error):
+        """Rate limits, 403s and network errors are logged and yield no items."""
+        service = FakeGmailService(list_pages=[list_error])
 
-        watcher = _make_live_watcher(tmp_vault, mock_gmail_service)
+        watcher = self._attach(live_watcher, service)
         results = watcher.check_for_updates()
         assert results == []
 
-    def test_check_for_updates_handles_connection_error(
-        self, tmp_vault, mock_gmail_service
-    ):
-        """ConnectionError returns empty list without crashing."""
-        mock_gmail_service.users().messages().list().execute.side_effect = (
-            ConnectionError("network down")
-        )
+    def test_check_for_updates_handles_auth_error(self, live_watcher):
+        """HttpError 401 attempts re-auth; raises if re-auth also fails."""
+        service = FakeGmailService(list_pages=[_make_http_error(401)])
 
-        watcher = _make_live_watcher(tmp_vault, mock_gmail_service)
-        results = watcher.check_for_updates()
-        assert results == []
+        watcher = self._attach(live_watcher, service)
 
-    def test_check_for_updates_respects_max_results(
-        self, tmp_vault, mock_gmail_service
-    ):
+        with patch.object(
+            gmail_module, "get_gmail_service",
+            side_effect=Exception("reauth failed"),
+        ):
+            with pytest.raises(Exception, match="reauth failed"):
+                watcher.check_for_updates()
+
+    def test_check_for_updates_respects_max_results(self, live_watcher):
         """Total messages fetched across pages is capped at 50."""
-        first_page = [{"id": f"msg_{i}"} for i in range(30)]
-        second_page = [{"id": f"msg_{i}"} for i in range(30, 60)]
+        first_page = list(_MESSAGE_REFS[:30])
+        second_page = list(_MESSAGE_REFS[30:60])
+        service = FakeGmailService(
+            list_pages=[
+                {"messages": first_page, "nextPageToken": "tok_abc"},
+                {"messages": second_page},
+            ]
+        )
 
-        mock_gmail_service.users().messages().list().execute.side_effect = [
-            {"messages": first_page, "nextPageToken": "tok_abc"},
-            {"messages": second_page},
-        ]
-        mock_gmail_service.users().messages().get().execute.return_value = (
-            _make_gmail_message()
+        watcher = self._attach(live_watcher, service)
+        results = watcher.check_for_updates()
+        assert len(results) == 50
+        # The second page only asks for the IDs still needed.
+        assert [c["maxResults"] for c in service.list_calls] == [50, 20]
+
+    def test_check_for_updates_stops_paginating_at_cap(self, live_watcher):
+        """No further page is requested once the first one fills the cap."""
+        service = FakeGmailService(
+            list_pages=[
+                {
+                    "messages": list(_MESSAGE_REFS[:50]),
+                    "nextPageToken": "tok_abc",
+                },
+            ]
         )
 
-        watcher = _make_live_watcher(tmp_vault, mock_gmail_service)
+        watcher = self._attach(live_watcher, service)
         results = watcher.check_for_updates()
-        assert len(results) <= 50
+        assert len(results) == 50
+        assert len(service.list_calls) == 1
 
-    def test_check_for_updates_empty_mailbox(self, tmp_vault, mock_gmail_service):
+    def test_check_for_updates_empty_mailbox(self, live_watcher):
         """No unread emails returns empty list (normal, not an error)."""
-        mock_gmail_service.users().messages().list().execute.return_value = {
-            "messages": [],
-        }
+        service = FakeGmailService(list_pages=[{"messages": []}])
 
-        watcher = _make_live_watcher(tmp_vault, mock_gmail_service)
+        watcher = self._attach(live_watcher, service)
         results = watcher.check_for_updates()
         assert results == []
 
@@ -319,9 +490,9 @@ class TestCheckForUpdates:
 
 
 class TestParseMessage:
-    def test_parse_message_extracts_headers(self, gmail_watcher, sample_gmail_message):
+    def test_parse_message_extracts_headers(self, ro_gmail_watcher, sample_gmail_message):
         """From, To, Subject, Date headers are correctly extracted."""
-        result = gmail_watcher._parse_message(sample_gmail_message)
+        result = ro_gmail_watcher._parse_message(sample_gmail_message)
         assert result["source"] == "Test Sender <sender@example.com>"
         assert result["sender_email"] == "sender@example.com"
         assert result["sender_name"] == "Test Sender"
@@ -330,13 +501,13 @@ class TestParseMessage:
         assert result["id"] == "test_id_001"
         assert result["thread_id"] == "thread_001"
 
-    def test_parse_message_extracts_plain_text_body(self, gmail_watcher):
+    def test_parse_message_extracts_plain_text_body(self, ro_gmail_watcher):
         """text/plain part is preferred over text/html."""
         msg = _make_gmail_message(body_text="Plain text body content.")
-        result = gmail_watcher._parse_message(msg)
+        result = ro_gmail_watcher._parse_message(msg)
         assert "Plain text body content." in result["content"]
 
-    def test_parse_message_falls_back_to_html(self, gmail_watcher):
+    def test_parse_message_falls_back_to_html(self, ro_gmail_watcher):
         """Falls back to HTML (stripped) when no text/plain part exists."""
         html_body = "<html><body><p>Hello <b>World</b></p></body></html>"
         html_part = {
@@ -345,20 +516,29 @@ class TestParseMessage:
             "parts": [],
         }
         msg = _make_gmail_message(parts=[html_part])
-        result = gmail_watcher._parse_message(msg)
+        result = ro_gmail_watcher._parse_message(msg)
         assert "Hello" in result["content"]
         assert "World" in result["content"]
         assert "<html>" not in result["content"]
         assert "<b>" not in result["content"]
 
-    def test_parse_message_truncates_long_body(self, gmail_watcher):
+    def test_parse_message_truncates_long_body(self, ro_gmail_watcher):
         """Bodies longer than 2000 characters are truncated."""
         long_body = "X" * 3000
         msg = _make_gmail_message(body_text=long_body)
-        result = gmail_watcher._parse_message(msg)
+        result = ro_gmail_watcher._parse_message(msg)
         assert len(result["content"]) <= 2000
 
-    def test_parse_message_handles_missing_headers(self, gmail_watcher):
+    def test_parse_message_truncated_multibyte_body_matches_full_decode(
+        self, ro_gmail_watcher
+    ):
+        """Cutting the base64 before decoding keeps the first 2000 characters intact."""
+        long_body = "é😀x" * 5000
+        msg = _make_gmail_message(body_text=long_body)
+        result = ro_gmail_watcher._parse_message(msg)
+        assert result["content"] == long_body[:2000]
+
+    def test_parse_message_handles_missing_headers(self, ro_gmail_watcher):
         """Sensible defaults are applied when headers are missing."""
         msg = {
             "id": "minimal_001",
@@ -372,12 +552,21 @@ class TestParseMessage:
                 "parts": [],
             },
         }
-        result = gmail_watcher._parse_message(msg)
+        result = ro_gmail_watcher._parse_message(msg)
         assert result["subject"] == "(No Subject)"
         assert result["to"] == ""
         assert result["source"] == ""
 
-    def test_parse_message_detects_attachments(self, gmail_watcher):
+    def test_parse_message_header_names_case_insensitive(self, ro_gmail_watcher):
+        """Header names match regardless of case, as RFC 5322 requires."""
+        msg = _make_gmail_message()
+        for header in msg["payload"]["headers"]:
+            header["name"] = header["name"].upper()
+        result = ro_gmail_watcher._parse_message(msg)
+        assert result["subject"] == "Test Subject"
+        assert result["sender_email"] == "sender@example.com"
+
+    def test_parse_message_detects_attachments(self, ro_gmail_watcher):
         """has_attachments flag and attachment_names are populated correctly."""
         plain_part = {
             "mimeType": "text/plain",
@@ -392,21 +581,83 @@ class TestParseMessage:
             "filename": "invoice.pdf",
         }
         msg = _make_gmail_message(parts=[plain_part, attachment_part])
-        result = gmail_watcher._parse_message(msg)
+        result = ro_gmail_watcher._parse_message(msg)
         assert result["has_attachments"] is True
         assert "invoice.pdf" in result["attachment_names"]
 
-    def test_parse_message_no_attachments(self, gmail_watcher, sample_gmail_message):
+    def test_parse_message_no_attachments(self, ro_gmail_watcher, sample_gmail_message):
         """Messages without attachments report has_attachments=False."""
-        result = gmail_watcher._parse_message(sample_gmail_message)
+        result = ro_gmail_watcher._parse_message(sample_gmail_message)
         assert result["has_attachments"] is False
         assert result["attachment_names"] == []
 
+    def test_parse_message_prefers_plain_over_html(self, ro_gmail_watcher):
+        """text/plain is chosen over text/html when both are present."""
+        plain_part = {
+            "mimeType": "text/plain",
+            "body": {"data": _encode("Plain preferred")},
+            "parts": [],
+        }
+        html_part = {
+            "mimeType": "text/html",
+            "body": {"data": _encode("<p>HTML fallback</p>")},
+            "parts": [],
+        }
+        msg = _make_gmail_message(parts=[plain_part, html_part])
+        result = ro_gmail_watcher._parse_message(msg)
+        assert "Plain preferred" in result["content"]
+        assert "HTML fallback" not in result["content"]
+
+    def test_parse_message_ignores_attached_text_file(self, ro_gmail_watcher):
+        """A text/plain attachment is not used as the message body."""
+        attachment = {
+            "mimeType": "text/plain",
+            "filename": "notes.txt",
+            "body": {"data": _encode("Attached notes")},
+            "parts": [],
+        }
+        html_part = {
+            "mimeType": "text/html",
+            "body": {"data": _encode("<p>Real body</p>")},
+            "parts": [],
+        }
+        msg = _make_gmail_message(parts=[attachment, html_part])
+        result = ro_gmail_watcher._parse_message(msg)
+        assert "Real body" in result["content"]
+        assert "Attached notes" not in result["content"]
+        assert result["attachment_names"] == ["notes.txt"]
+
+    @pytest.mark.parametrize(
+        "snippet,expected",
+        [("Snippet preview text", "Snippet preview text"), ("", "(No content)")],
+        ids=["snippet", "no_content"],
+    )
+    def test_parse_message_empty_body_fallback(self, ro_gmail_watcher, snippet, expected):
+        """An empty body falls back to the snippet, then to '(No content)'."""
+        msg = _make_gmail_message(body_text="")
+        msg["snippet"] = snippet
+        result = ro_gmail_watcher._parse_message(msg)
+        assert result["content"] == expected
+
+    def test_parse_message_nested_attachments_in_document_order(self, ro_gmail_watcher):
+        """Nested multipart trees list filenames in document order."""
+        related = {
+            "mimeType": "multipart/related",
+            "parts": [
+                {"filename": "first.png", "body": {}, "parts": []},
+                {"filename": "second.png", "body": {}, "parts": []},
+            ],
+        }
+        third = {"filename": "third.pdf", "body": {}, "parts": []}
+        msg = _make_gmail_message(parts=[related, third])
+        result = ro_gmail_watcher._parse_message(msg)
+        assert result["attachment_names"] == ["first.png", "second.png", "third.pdf"]
+
     def test_parse_message_sets_requires_approval_false(
-        self, gmail_watcher, sample_gmail_message
+        self, ro_gmail_watcher, sample_gmail_message
     ):
         """Email triage never requires approval."""
-        result = gmail_watcher._parse_message(sample_gmail_message)
+        result = ro_gmail_watcher._parse_message(sample_gmail_message)
         assert result["requires_approval"] is False
 
 
@@ -416,51 +667,37 @@ class TestParseMessage:
 
 
 class TestClassifyPriority:
-    def test_classify_critical(self, gmail_watcher):
-        """IMPORTANT label + urgent keyword in subject → critical."""
-        msg = {"labels": ["IMPORTANT", "INBOX"], "subject": "URGENT: Please help"}
-        assert gmail_watcher._classify_priority(msg) == "critical"
-
-    def test_classify_critical_asap(self, gmail_watcher):
-        """IMPORTANT label + 'asap' keyword → critical."""
-        msg = {"labels": ["IMPORTANT", "INBOX"], "subject": "Need ASAP response"}
-        assert gmail_watcher._classify_priority(msg) == "critical"
-
-    def test_classify_high(self, gmail_watcher):
-        """IMPORTANT label without urgent keywords → high."""
-        msg = {"labels": ["IMPORTANT", "INBOX"], "subject": "Meeting tomorrow"}
-        assert gmail_watcher._classify_priority(msg) == "high"
-
-    def test_classify_low_promotion(self, gmail_watcher):
-        """CATEGORY_PROMOTIONS label → low."""
-        msg = {
-            "labels": ["CATEGORY_PROMOTIONS", "INBOX"],
-            "subject": "Sale on now!",
-        }
-        assert gmail_watcher._classify_priority(msg) == "low"
-
-    def test_classify_low_social(self, gmail_watcher):
-        """CATEGORY_SOCIAL label → low."""
-        msg = {
-            "labels": ["CATEGORY_SOCIAL", "INBOX"],
-            "subject": "Someone liked your post",
-        }
-        assert gmail_watcher._classify_priority(msg) == "low"
-
-    def test_classify_low_spam(self, gmail_watcher):
-        """SPAM label → low."""
-        msg = {"labels": ["SPAM"], "subject": "You won a million dollars!"}
-        assert gmail_watcher._classify_priority(msg) == "low"
-
-    def test_classify_medium_default(self, gmail_watcher):
-        """No special labels → medium."""
-        msg = {"labels": ["INBOX"], "subject": "Regular email"}
-        assert gmail_watcher._classify_priority(msg) == "medium"
-
-    def test_classify_medium_empty_labels(self, gmail_watcher):
-        """Empty label list → medium."""
-        msg = {"labels": [], "subject": "Some email"}
-        assert gmail_watcher._classify_priority(msg) == "medium"
+    @pytest.mark.parametrize(
+        "labels,subject,expected",
+        [
+            # IMPORTANT label + urgent keyword in subject → critical
+            (["IMPORTANT", "INBOX"], "URGENT: Please help", "critical"),
+            (["IMPORTANT", "INBOX"], "Need ASAP response", "critical"),
+            # IMPORTANT label without urgent keywords → high
+            (["IMPORTANT", "INBOX"], "Meeting tomorrow", "high"),
+            # Promotions, social and spam → low
+            (["CATEGORY_PROMOTIONS", "INBOX"], "Sale on now!", "low"),
+            (["CATEGORY_SOCIAL", "INBOX"], "Someone liked your post", "low"),
+            (["SPAM"], "You won a million dollars!", "low"),
+            # No special labels → medium
+            (["INBOX"], "Regular email", "medium"),
+            ([], "Some email", "medium"),
+        ],
+        ids=[
+            "critical",
+            "critical_asap",
+            "high",
+            "low_promotion",
+            "low_social",
+            "low_spam",
+            "medium_default",
+            "medium_empty_labels",
+        ],
+    )
+    def test_classify(self, ro_gmail_watcher, labels, subject, expected):
+        """Labels and subject keywords map to the expected priority."""
+        msg = {"labels": labels, "subject": subject}
+        assert ro_gmail_watcher._classify_priority(msg) == expected
 
 
 # ---------------------------------------------------------------------------
@@ -468,54 +705,92 @@ class TestClassifyPriority:
 # ---------------------------------------------------------------------------
 
 
-class TestCreateActionFile:
-    def _sample_item(self) -> dict:
-        return {
-            "id": "test_001",
-            "thread_id": "thread_001",
-            "type": "email",
-            "source": "John Doe <john@example.com>",
-            "sender_email": "john@example.com",
-            "sender_name": "John Doe",
-            "to": "employee@company.com",
-            "subject": "Meeting request",
-            "received": "2026-02-26T10:30:00+00:00",
-            "content": "Can we meet tomorrow?",
-            "snippet": "Can we meet tomorrow?",
-            "labels": ["IMPORTANT", "INBOX"],
-            "has_attachments": False,
-            "attachment_names": [],
-            "priority": "high",
-            "requires_approval": False,
-        }
+# Parsed email item used by TestCreateActionFile; copy before mutating.
+_SAMPLE_EMAIL: dict = {
+    "id": "test_001",
+    "thread_id": "thread_001",
+    "type": "email",
+    "source": "John Doe <john@example.com>",
+    "sender_email": "john@example.com",
+    "sender_name": "John Doe",
+    "to": "employee@company.com",
+    "subject": "Meeting request",
+    "received": "2026-02-26T10:30:00+00:00",
+    "content": "Can we meet tomorrow?",
+    "snippet": "Can we meet tomorrow?",
+    "labels": ["IMPORTANT", "INBOX"],
+    "has_attachments": False,
+    "attachment_names": [],
+    "priority": "high",
+    "requires_approval": False,
+}
+
+
+@pytest.fixture(scope="class")
+def written_action(tmp_path_factory) -> tuple[Path, str]:
+    """Write one action file per class and return its path and full text."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DRY_RUN", "true")
+        watcher = GmailWatcher(vault_path=tmp_path_factory.mktemp("action_vault"))
+    path = watcher.create_action_file(_SAMPLE_EMAIL)
+    return path, path.read_text(encoding="utf-8")
+
+
+@pytest.fixture(scope="class")
+def action_frontmatter(written_action) -> dict:
+    """Parsed frontmatter of the shared action file."""
+    return read_frontmatter(written_action[0])
 
-    def test_create_action_file_writes_valid_md(self, gmail_watcher):
+
+class TestCreateActionFile:
+    def test_create_action_file_writes_valid_md(self, written_action):
         """File is created on disk with .md extension."""
-        path = gmail_watcher.create_action_file(self._sample_item())
+        path, _ = written_action
         assert path.exists()
         assert path.suffix == ".md"
 
-    def test_create_action_file_has_yaml_frontmatter(self, gmail_watcher):
+    def test_create_action_file_has_yaml_frontmatter(self, action_frontmatter):
         """File has parseable YAML frontmatter with all required fields."""
-        path = gmail_watcher.create_action_file(self._sample_item())
-        content = path.read_text(encoding="utf-8")
-        assert content.startswith("---")
-
-        end = content.find("\n---", 3)
-        fm = yaml.safe_load(content[3:end].strip())
-
-        assert fm["type"] == "email"
-        assert fm["sender_email"] == "john@example.com"
-        assert fm["subject"] == "Meeting request"
-        assert fm["priority"] == "high"
-        assert fm["status"] == "pending"
-        assert fm["requires_approval"] is False
-        assert fm["message_id"] == "test_001"
-        assert fm["thread_id"] == "thread_001"
-
-    def test_create_action_file_correct_filename_format(self, gmail_watcher):
+        required_fields = {
+            "type",
+            "source",
+            "sender_email",
+            "subject",
+            "received",
+            "priority",
+            "status",
+            "requires_approval",
+            "message_id",
+            "thread_id",
+            "labels",
+            "has_attachments",
+        }
+        missing = required_fields - action_frontmatter.keys()
+        assert not missing, f"Missing frontmatter fields: {sorted(missing)}"
+
+    @pytest.mark.parametrize(
+        "field,expected",
+        [
+            ("type", "email"),
+            ("sender_email", "john@example.com"),
+            ("subject", "Meeting request"),
+            ("priority", "high"),
+            ("status", "pending"),
+            ("requires_approval", False),
+            ("message_id", "test_001"),
+            ("thread_id", "thread_001"),
+        ],
+    )
+    def test_create_action_file_frontmatter_field(
+        self, action_frontmatter, field, expected
+    ):
+        """Each required frontmatter field carries the expected value."""
+        assert action_frontmatter[field] == expected
+        assert type(action_frontmatter[field]) is type(expected)
+
+    def test_create_action_file_correct_filename_format(self, written_action):
         """Filename starts with EMAIL_ and ends with .md."""
-        path = gmail_watcher.create_action_file(self._sample_item())
+        path, _ = written_action
         assert path.name.startswith("EMAIL_")
         assert path.name.endswith(".md")
         # Timestamp portion should be present (letters/digits/hyphens after sender)
@@ -523,7 +798,7 @@ class TestCreateActionFile:
 
     def test_create_action_file_sanitizes_filename(self, gmail_watcher):
         """Special characters in sender email are sanitized from the filename."""
-        item = self._sample_item()
+        item = _SAMPLE_EMAIL.copy()
         item["sender_email"] = "sender+tag@example.com"
         path = gmail_watcher.create_action_file(item)
         assert path.exists()
@@ -531,25 +806,22 @@ class TestCreateActionFile:
         for char in (":", "<", ">", '"', "\\", "/", "*", "?", "|"):
             assert char not in path.name
 
-    def test_create_action_file_suggested_actions_present(self, gmail_watcher):
+    def test_create_action_file_suggested_actions_present(self, written_action):
         """Suggested action checkbox list is in the file body."""
-        path = gmail_watcher.create_action_file(self._sample_item())
-        content = path.read_text(encoding="utf-8")
+        _, content = written_action
         assert "- [ ] Reply to sender" in content
         assert "- [ ] Forward to relevant party" in content
         assert "- [ ] Flag for follow-up" in content
         assert "- [ ] Archive after processing" in content
 
-    def test_create_action_file_content_in_body(self, gmail_watcher):
+    def test_create_action_file_content_in_body(self, written_action):
         """Email content appears in the Markdown body."""
-        path = gmail_watcher.create_action_file(self._sample_item())
-        content = path.read_text(encoding="utf-8")
+        _, content = written_action
         assert "Can we meet tomorrow?" in content
 
-    def test_create_action_file_metadata_section(self, gmail_watcher):
+    def test_create_action_file_metadata_section(self, written_action):
         """Metadata section lists From, To, Date."""
-        path = gmail_watcher.create_action_file(self._sample_item())
-        content = path.read_text(encoding="utf-8")
+        _, content = written_action
         assert "**From:**" in content
         assert "**To:**" in content
         assert "**Date:**" in content
@@ -568,11 +840,7 @@ class TestIntegration:
 
         for path in created:
             assert path.exists()
-            content = path.read_text(encoding="utf-8")
-            assert content.startswith("---")
-
-            end = content.find("\n---", 3)
-            fm = yaml.safe_load(content[3:end].strip())
+            fm = read_frontmatter(path)
             assert fm["type"] == "email"
             assert fm["status"] == "pending"
             assert fm["priority"] in ("critical", "high", "medium", "low")
@@ -585,7 +853,7 @@ class TestIntegration:
         log_file = gmail_watcher.logs_path / f"{today}.json"
 
         assert log_file.exists()
-        entries = json.loads(log_file.read_text(encoding="utf-8"))
+        entries = json.loads(log_file.read_bytes())
         assert len(entries) >= 3
         for entry in entries:
             assert entry["action_type"] == "watcher_detect"
@@ -593,19 +861,16 @@ class TestIntegration:
             assert "timestamp" in entry
 
     def test_run_once_deduplication(self, gmail_watcher):
-        """Running run_once twice does not create duplicate files."""
-        created_first = gmail_watcher.run_once()
-        created_second = gmail_watcher.run_once()
-        assert len(created_first) == 3
-        assert len(created_second) == 0  # all already processed
+        """A second cycle over the same messages creates no new action files."""
+        assert len(gmail_watcher.run_once()) == 3
+        files_after_first = len(list(gmail_watcher.needs_action_path.glob("*.md")))
+
+        assert gmail_watcher.run_once() == []
+        assert len(list(gmail_watcher.needs_action_path.glob("*.md"))) == files_after_first
 
-    def test_dry_run_priorities_are_varied(self, gmail_watcher):
+    def test_dry_run_priorities_are_varied(self, dry_run_items):
         """Dry-run data contains critical, high, and low priority emails."""
-        items = gmail_watcher.check_for_updates()
-        priorities = {item["priority"] for item in items}
-        assert "critical" in priorities
-        assert "high" in priorities
-        assert "low" in priorities
+        assert {"critical", "high", "low"} <= {item["priority"] for item in dry_run_items}
 
 
 # ---------------------------------------------------------------------------
@@ -630,63 +895,6 @@ class TestHelperFunctions:
         result = _parse_gmail_date("not a date at all !@#$")
         assert "T" in result
 
-    def test_extract_body_plain_text(self):
-        """text/plain part is decoded correctly."""
-        msg = _make_gmail_message(body_text="Hello plain text")
-        result = _extract_body(msg)
-        assert "Hello plain text" in result
-
-    def test_extract_body_prefers_plain_over_html(self):
-        """text/plain is chosen over text/html when both are present."""
-        plain_part = {
-            "mimeType": "text/plain",
-            "body": {"data": _encode("Plain preferred")},
-            "parts": [],
-        }
-        html_part = {
-            "mimeType": "text/html",
-            "body": {"data": _encode("<p>HTML fallback</p>")},
-            "parts": [],
-        }
-        msg = _make_gmail_message(parts=[plain_part, html_part])
-        result = _extract_body(msg)
-        assert "Plain preferred" in result
-        assert "HTML fallback" not in result
-
-    def test_extract_body_fallback_snippet(self):
-        """Falls back to snippet when no body parts exist."""
-        msg = {
-            "id": "x",
-            "threadId": "y",
-            "snippet": "Snippet preview text",
-            "labelIds": [],
-            "payload": {
-                "mimeType": "text/plain",
-                "headers": [],
-                "body": {"data": ""},
-                "parts": [],
-            },
-        }
-        result = _extract_body(msg)
-        assert "Snippet preview text" in result
-
-    def test_extract_body_no_content(self):
-        """Returns '(No content)' when body and snippet are both empty."""
-        msg = {
-            "id": "x",
-            "threadId": "y",
-            "snippet": "",
-            "labelIds": [],
-            "payload": {
-                "mimeType": "text/plain",
-                "headers": [],
-                "body": {"data": ""},
-                "parts": [],
-            },
-        }
-        result = _extract_body(msg)
-        assert result == "(No content)"
-
     def test_strip_html_removes_tags(self):
         """HTML tags are stripped from text."""
         result = _strip_html("<p>Hello <b>World</b></p>")
@@ -700,35 +908,3 @@ class TestHelperFunctions:
         result = _strip_html("<script>alert('xss')</script>Hello")
         assert "alert" not in result
         assert "Hello" in result
-
-    def test_check_attachments_true(self):
-        """Returns True when payload contains a part with a filename."""
-        msg = {
-            "payload": {
-                "mimeType": "multipart/mixed",
-                "parts": [
-                    {"filename": "doc.pdf", "body": {}, "parts": []},
-                ],
-            }
-        }
-        assert _check_attachments(msg) is True
-
-    def test_check_attachments_false(self):
-        """Returns False when no parts have filenames."""
-        msg = _make_gmail_message()
-        assert _check_attachments(msg) is False
-
-    def test_get_attachment_names(self):
-        """Returns a list of attachment filenames."""
-        msg = {
-            "payload": {
-                "mimeType": "multipart/mixed",
-                "parts": [
-                    {"filename": "report.pdf", "body": {}, "parts": []},
-                    {"filename": "photo.jpg", "body": {}, "parts": []},
-                ],
-            }
-        }
-        names = _get_attachment_names(msg)
-        assert "report.pdf" in names
-        assert "photo.jpg" in names